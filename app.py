@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.language import get_text
+from utils.world_bank import start_background_refresh
 
 st.set_page_config(
     page_title="Economics & Data Science Portfolio",
@@ -15,6 +16,9 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Warm the World Bank data snapshot at startup so the data pages never wait on the API
+start_background_refresh()
+
 # Language Toggle in Sidebar
 if 'language' not in st.session_state:
     st.session_state['language'] = 'ID'
@@ -6,8 +6,17 @@ from plotly.subplots import make_subplots
 from scipy.optimize import minimize, differential_evolution
 from scipy import stats
 import warnings
+import sys
+import os
 warnings.filterwarnings('ignore')
 
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.monte_carlo import (draw_uncertainty, simulate_policy_outcomes,
+                               run_monte_carlo, summary_risk_metrics)
+from utils.macro_simulation import simulate_taylor_paths, resilience_metrics
+
 st.set_page_config(page_title="Professional Macro Policy AI", page_icon="🎯", layout="wide")
 
 if 'language' not in st.session_state:
@@ -50,6 +59,8 @@ T = {
         'optimize': "🚀 Run Professional Optimization",
         'monte_carlo': "Enable Monte Carlo Risk Analysis",
         'n_simulations': "Number of Simulations",
+        'mc_seed': "Random Seed",
+        'policy_gain': "Growth Gain vs Current Policy",
         'results': "Optimization Results",
         'optimal_policy': "Optimal Policy Mix",
         'risk_metrics': "Risk Metrics",
@@ -64,6 +75,7 @@ T = {
         'predicted_inflation': "Predicted Inflation",
         'predicted_unemployment': "Predicted Unemployment",
         'policy_score': "Policy Effectiveness Score",
+        'solver_info': "SLSQP with analytic gradient: {nfev} objective evaluations",
         # Tab 4
         'stress_title': "Comprehensive Stress Testing",
         'stress_intro': "Test policy robustness under extreme economic scenarios",
@@ -73,6 +85,9 @@ T = {
         'resilience_score': "Resilience Score",
         'max_drawdown': "Maximum Drawdown",
         'recovery_time': "Recovery Time (Quarters)",
+        'run_library': "Run Full Scenario Library",
+        'library_results': "Scenario Library Ranking",
+        'library_heatmap': "Worst-Case Resilience (across supply shocks)",
         # Tab 5
         'dashboard_title': "Real-Time Policy Control Center",
         'current_status': "Current Economic Status",
@@ -118,6 +133,8 @@ T = {
         'optimize': "🚀 Jalankan Optimasi Profesional",
         'monte_carlo': "Aktifkan Analisis Risiko Monte Carlo",
         'n_simulations': "Jumlah Simulasi",
+        'mc_seed': "Seed Acak",
+        'policy_gain': "Tambahan Pertumbuhan vs Kebijakan Saat Ini",
         'results': "Hasil Optimasi",
         'optimal_policy': "Bauran Kebijakan Optimal",
         'risk_metrics': "Metrik Risiko",
@@ -132,6 +149,7 @@ T = {
         'predicted_inflation': "Inflasi Prediksi",
         'predicted_unemployment': "Pengangguran Prediksi",
         'policy_score': "Skor Efektivitas Kebijakan",
+        'solver_info': "SLSQP dengan gradien analitik: {nfev} evaluasi fungsi objektif",
         # Tab 4
         'stress_title': "Stress Testing Komprehensif",
         'stress_intro': "Uji ketahanan kebijakan di bawah skenario ekonomi ekstrem",
@@ -141,6 +159,9 @@ T = {
         'resilience_score': "Skor Ketahanan",
         'max_drawdown': "Penurunan Maksimum",
         'recovery_time': "Waktu Pemulihan (Kuartal)",
+        'run_library': "Jalankan Seluruh Pustaka Skenario",
+        'library_results': "Peringkat Pustaka Skenario",
+        'library_heatmap': "Ketahanan Kasus Terburuk (seluruh guncangan penawaran)",
         # Tab 5
         'dashboard_title': "Pusat Kontrol Kebijakan Real-Time",
         'current_status': "Status Ekonomi Saat Ini",
@@ -162,148 +183,148 @@ if 'scenarios' not in st.session_state:
 
 # ==================== HELPER FUNCTIONS ====================
 
+PARALLEL_MC_THRESHOLD = 500_000
+
 @st.cache_data
 def monte_carlo_risk_analysis(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, 
-                               target_growth, target_inflation, target_unemployment, n_sim=5000):
-    """Monte Carlo simulation for risk analysis"""
+                               target_growth, target_inflation, target_unemployment, n_sim=5000, seed=42):
+    """Monte Carlo simulation for risk analysis (seeded, so the cache key fully determines the result)"""
     
-    # Parameter distributions (uncertainty)
-    MPC_dist = np.random.normal(0.75, 0.05, n_sim)
-    alpha_I_dist = np.random.normal(200, 20, n_sim)
-    alpha_NX_dist = np.random.normal(100, 15, n_sim)
+    # Draws are streamed into mergeable summaries, so only a compact histogram is kept;
+    # multi-million draw runs are split into seeded chunks across CPU cores
+    n_workers = None if n_sim > PARALLEL_MC_THRESHOLD else 1
+    merged, edges = run_monte_carlo(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment,
+                                    n_sim, seed, n_workers)
+    return summary_risk_metrics(merged, edges)
+
+@st.cache_data
+def compare_policies(G_candidates, r_candidates, C, I, G, NX, r, inflation, unemployment, n_sim=5000, seed=42):
+    """Compare candidate policies against the first one using common random numbers"""
     
-    # Shock distributions
-    demand_shocks = np.random.normal(0, 0.5, n_sim)
-    supply_shocks = np.random.normal(0, 0.3, n_sim)
+    draws = draw_uncertainty(n_sim, seed)
+    growth, _, _ = simulate_policy_outcomes(
+        np.asarray(G_candidates), np.asarray(r_candidates), C, I, G, NX, r, inflation, unemployment, draws
+    )
     
-    growth_dist = []
-    inflation_dist = []
-    unemployment_dist = []
+    # Paired differences cancel the shared shock noise
+    diff = growth - growth[0]
+    diff_se = diff.std(axis=1, ddof=1) / np.sqrt(n_sim)
+    # Standard error the same comparison would have with independent draws
+    independent_se = np.sqrt(growth.var(axis=1, ddof=1) + growth[0].var(ddof=1)) / np.sqrt(n_sim)
     
+    return pd.DataFrame({
+        'G': np.asarray(G_candidates, dtype=float),
+        'r': np.asarray(r_candidates, dtype=float),
+        'growth_mean': growth.mean(axis=1),
+        'growth_diff': diff.mean(axis=1),
+        'diff_se': diff_se,
+        'independent_se': independent_se
+    })
+
+# Deterministic policy model parameters
+MPC = 0.75
+ALPHA_I = 200
+ALPHA_NX = 100
+
+def policy_outcomes(G_new, r_new, baseline):
+    """Growth, inflation and unemployment for scalar or array (G, r) policies (broadcasts over grids)"""
+    C, I, G, NX, r, inflation, unemployment = baseline
     current_gdp = C + I + G + NX
     
-    for i in range(n_sim):
-        MPC = np.clip(MPC_dist[i], 0.5, 0.9)
-        alpha_I = np.clip(alpha_I_dist[i], 100, 300)
-        alpha_NX = np.clip(alpha_NX_dist[i], 50, 150)
-        
-        # Calculate with uncertainty
-        I_new = I - alpha_I * (r_opt - r) + demand_shocks[i] * 100
-        NX_new = NX - alpha_NX * (r_opt - r) + demand_shocks[i] * 50
-        C_new = C + MPC * (G_opt - G) + demand_shocks[i] * 200
-        
-        GDP_new = C_new + I_new + G_opt + NX_new
-        growth = ((GDP_new - current_gdp) / current_gdp) * 100
-        
-        # Inflation with uncertainty
-        output_gap = (GDP_new - current_gdp) / current_gdp * 100
-        inflation_new = inflation + 0.3 * output_gap - 0.2 * (r_opt - r) + supply_shocks[i]
-        
-        # Unemployment
-        unemployment_new = unemployment - 0.5 * (growth - 2)
-        
-        growth_dist.append(growth)
-        inflation_dist.append(inflation_new)
-        unemployment_dist.append(unemployment_new)
-    
-    # Calculate risk metrics
-    growth_mean = np.mean(growth_dist)
-    growth_std = np.std(growth_dist)
-    growth_ci_lower = np.percentile(growth_dist, 2.5)
-    growth_ci_upper = np.percentile(growth_dist, 97.5)
-    growth_var_95 = np.percentile(growth_dist, 5)
-    growth_cvar_95 = np.mean([g for g in growth_dist if g <= growth_var_95])
-    prob_recession = np.mean([g < 0 for g in growth_dist]) * 100
+    # GDP_new - current_gdp = (1 + MPC) * dG - (alpha_I + alpha_NX) * dr
+    gdp_change = (1 + MPC) * (G_new - G) - (ALPHA_I + ALPHA_NX) * (r_new - r)
+    growth = gdp_change / current_gdp * 100
+    inflation_new = inflation + 0.3 * growth - 0.2 * (r_new - r)
+    unemployment_new = unemployment - 0.5 * (growth - 2)
     
-    inflation_mean = np.mean(inflation_dist)
-    inflation_std = np.std(inflation_dist)
-    inflation_ci_lower = np.percentile(inflation_dist, 2.5)
-    inflation_ci_upper = np.percentile(inflation_dist, 97.5)
+    return growth, inflation_new, unemployment_new
+
+def policy_loss(G_new, r_new, baseline, targets, weights):
+    """Weighted quadratic loss for scalar or array (G, r) policies"""
+    errors = [actual - target for actual, target in zip(policy_outcomes(G_new, r_new, baseline), targets)]
+    return sum(w * e**2 for w, e in zip(weights, errors))
+
+def policy_loss_grad(G_new, r_new, baseline, targets, weights):
+    """Analytic gradient of policy_loss with respect to (G, r)"""
+    C, I, G, NX, r, inflation, unemployment = baseline
+    current_gdp = C + I + G + NX
     
-    unemployment_mean = np.mean(unemployment_dist)
-    unemployment_std = np.std(unemployment_dist)
+    # Partial derivatives of growth, inflation and unemployment (the model is linear in G and r)
+    dgrowth = np.array([(1 + MPC), -(ALPHA_I + ALPHA_NX)]) / current_gdp * 100
+    doutcomes = [dgrowth, 0.3 * dgrowth + np.array([0, -0.2]), -0.5 * dgrowth]
     
-    return {
-        'growth': {'mean': growth_mean, 'std': growth_std, 
-                  'ci_lower': growth_ci_lower, 'ci_upper': growth_ci_upper,
-                  'var_95': growth_var_95, 'cvar_95': growth_cvar_95,
-                  'dist': growth_dist},
-        'inflation': {'mean': inflation_mean, 'std': inflation_std,
-                     'ci_lower': inflation_ci_lower, 'ci_upper': inflation_ci_upper,
-                     'dist': inflation_dist},
-        'unemployment': {'mean': unemployment_mean, 'std': unemployment_std,
-                        'dist': unemployment_dist},
-        'prob_recession': prob_recession
-    }
+    errors = [actual - target for actual, target in zip(policy_outcomes(G_new, r_new, baseline), targets)]
+    return sum(2 * w * e * d for w, e, d in zip(weights, errors, doutcomes))
 
-def run_stress_test(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenario_params):
-    """Run stress test for a specific scenario"""
+def policy_constraints(baseline, max_deficit, max_rate_change):
+    """Linear SLSQP constraints with exact Jacobians; |dr| <= max is split into two smooth halves"""
+    C, I, G, NX, r, inflation, unemployment = baseline
+    current_gdp = C + I + G + NX
     
+    return [
+        {'type': 'ineq', 'fun': lambda x: max_deficit - (x[0] - G) / current_gdp * 100,
+         'jac': lambda x: np.array([-100 / current_gdp, 0.0])},
+        {'type': 'ineq', 'fun': lambda x: max_rate_change - (x[1] - r),
+         'jac': lambda x: np.array([0.0, -1.0])},
+        {'type': 'ineq', 'fun': lambda x: max_rate_change + (x[1] - r),
+         'jac': lambda x: np.array([0.0, 1.0])}
+    ]
+
+@st.cache_data
+def policy_loss_surface(baseline, targets, weights, G_bounds, r_bounds, max_deficit, max_rate_change, n_points=100):
+    """Loss over an n_points x n_points (G, r) grid in one array pass; infeasible policies are NaN"""
+    C, I, G, NX, r, inflation, unemployment = baseline
     current_gdp = C + I + G + NX
-    periods = 12
     
-    # Initialize paths
-    gdp_path = np.zeros(periods)
-    inflation_path = np.zeros(periods)
-    unemployment_path = np.zeros(periods)
-    rate_path = np.zeros(periods)
+    G_grid = np.linspace(*G_bounds, n_points)
+    r_grid = np.linspace(*r_bounds, n_points)
+    G_mesh, r_mesh = np.meshgrid(G_grid, r_grid)
     
-    gdp_path[0] = current_gdp
-    inflation_path[0] = inflation
-    unemployment_path[0] = unemployment
-    rate_path[0] = r_opt
+    loss = policy_loss(G_mesh, r_mesh, baseline, targets, weights)
+    feasible = ((G_mesh - G) / current_gdp * 100 <= max_deficit) & (np.abs(r_mesh - r) <= max_rate_change)
     
-    # Apply shocks
-    for t in range(1, periods):
-        if t == 2:  # Shock hits in period 2
-            gdp_path[t] = gdp_path[t-1] * (1 + scenario_params['demand_shock']/100)
-            inflation_path[t] = inflation_path[t-1] + scenario_params['supply_shock']
-            rate_path[t] = rate_path[t-1] + scenario_params['financial_shock']
-        
-        # Policy response (Taylor Rule)
-        if t > 2:
-            inflation_gap = inflation_path[t-1] - 3.0  # Target inflation
-            output_gap = (gdp_path[t-1] - current_gdp) / current_gdp * 100
-            rate_path[t] = r_opt + 0.5 * inflation_gap + 0.5 * output_gap
-            rate_path[t] = np.clip(rate_path[t], 2.0, 10.0)
-        
-        # Economic dynamics
-        if t > 0 and gdp_path[t] == 0:
-            gdp_growth = -0.5 * (rate_path[t] - rate_path[t-1]) + 0.3 * (inflation_path[t-1] - 2)
-            gdp_path[t] = gdp_path[t-1] * (1 + gdp_growth/100)
-            
-            if inflation_path[t] == 0:
-                inflation_path[t] = inflation_path[t-1] + 0.2 * gdp_growth - 0.3 * (rate_path[t] - rate_path[t-1])
-            
-            unemployment_path[t] = unemployment_path[t-1] - 0.5 * gdp_growth
-    
-    # Calculate resilience metrics
-    max_drawdown = min((gdp_path - current_gdp) / current_gdp * 100)
-    recovery_time = 0
-    for t in range(len(gdp_path)):
-        if gdp_path[t] >= current_gdp * 0.99:
-            recovery_time = t
-            break
-    if recovery_time == 0:
-        recovery_time = periods
+    return G_grid, r_grid, np.where(feasible, loss, np.nan)
+
+def run_stress_test_batch(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, shocks, periods=12):
+    """Run many stress scenarios at once.
     
-    avg_inflation = np.mean(inflation_path)
-    max_unemployment = max(unemployment_path)
+    shocks is an (n_scenarios, 3) array of (demand, supply, financial) shocks hitting in
+    period 2; the policy rate starts at r_opt and reacts via a Taylor rule around it.
+    """
+    current_gdp = C + I + G + NX
     
-    resilience_score = max(0, 100 - abs(max_drawdown) * 10 - recovery_time * 5)
+    paths = simulate_taylor_paths(current_gdp, inflation, unemployment, r_opt, shocks, periods,
+                                  target_inflation=3.0, min_rate=2.0, max_rate=10.0)
+    metrics = resilience_metrics(paths['gdp'], paths['inflation'], paths['unemployment'], current_gdp)
     
     return {
-        'gdp_path': gdp_path,
-        'inflation_path': inflation_path,
-        'unemployment_path': unemployment_path,
-        'rate_path': rate_path,
-        'max_drawdown': max_drawdown,
-        'recovery_time': recovery_time,
-        'avg_inflation': avg_inflation,
-        'max_unemployment': max_unemployment,
-        'resilience_score': resilience_score
+        'gdp_path': paths['gdp'],
+        'inflation_path': paths['inflation'],
+        'unemployment_path': paths['unemployment'],
+        'rate_path': paths['rate'],
+        **metrics
     }
 
+def run_stress_test(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, scenario_params):
+    """Run stress test for a specific scenario"""
+    
+    shocks = [scenario_params['demand_shock'], scenario_params['supply_shock'], scenario_params['financial_shock']]
+    batch = run_stress_test_batch(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, [shocks])
+    
+    return {key: value[0] for key, value in batch.items()}
+
+def stress_test_library(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, shocks):
+    """Rank a library of (demand, supply, financial) shock scenarios by resilience"""
+    
+    batch = run_stress_test_batch(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, shocks)
+    
+    library = pd.DataFrame(np.asarray(shocks, dtype=float),
+                           columns=['demand_shock', 'supply_shock', 'financial_shock'])
+    for key in ['resilience_score', 'max_drawdown', 'recovery_time', 'avg_inflation', 'max_unemployment']:
+        library[key] = batch[key]
+    
+    return library.sort_values('resilience_score', ascending=False)
+
 def generate_policy_statement(results, lang='ID'):
     """Generate central bank-style policy statement"""
     
@@ -424,70 +445,35 @@ with tab1:
         enable_mc = st.checkbox(txt['monte_carlo'], value=True)
         if enable_mc:
             n_sim = st.select_slider(txt['n_simulations'], 
-                                     options=[1000, 2500, 5000, 10000], 
+                                     options=[1000, 2500, 5000, 10000, 50000, 100000, 1000000, 5000000], 
                                      value=5000)
+            mc_seed = st.number_input(txt['mc_seed'], value=42, min_value=0, step=1)
         
         if st.button(txt['optimize'], type='primary'):
             with st.spinner('Running professional optimization...'):
-                # Parameters
-                MPC = 0.75
-                alpha_I = 200
-                alpha_NX = 100
-                
-                # Objective function
-                def objective(x):
-                    G_new, r_new = x
-                    
-                    I_new = I - alpha_I * (r_new - r)
-                    NX_new = NX - alpha_NX * (r_new - r)
-                    C_new = C + MPC * (G_new - G)
-                    
-                    GDP_new = C_new + I_new + G_new + NX_new
-                    growth_actual = ((GDP_new - current_gdp) / current_gdp) * 100
-                    
-                    output_gap = (GDP_new - current_gdp) / current_gdp * 100
-                    inflation_new = inflation + 0.3 * output_gap - 0.2 * (r_new - r)
-                    
-                    unemployment_new = unemployment - 0.5 * (growth_actual - 2)
-                    
-                    loss_growth = w_growth * (growth_actual - target_growth)**2
-                    loss_inflation = w_inflation * (inflation_new - target_inflation)**2
-                    loss_unemployment = w_unemployment * (unemployment_new - target_unemployment)**2
-                    
-                    return loss_growth + loss_inflation + loss_unemployment
-                
-                # Constraints
-                def constraint_deficit(x):
-                    G_new, r_new = x
-                    deficit = (G_new - G) / current_gdp * 100
-                    return max_deficit - deficit
-                
-                def constraint_rate_change(x):
-                    G_new, r_new = x
-                    return max_rate_change - abs(r_new - r)
+                baseline = (C, I, G, NX, r, inflation, unemployment)
+                targets = (target_growth, target_inflation, target_unemployment)
+                weights = (w_growth, w_inflation, w_unemployment)
                 
                 bounds = [(G * 0.8, G * 1.5), (min_rate, max_rate)]
-                constraints = [
-                    {'type': 'ineq', 'fun': constraint_deficit},
-                    {'type': 'ineq', 'fun': constraint_rate_change}
-                ]
-                
                 x0 = [G, r]
-                result = minimize(objective, x0, method='SLSQP', bounds=bounds, constraints=constraints)
+                result = minimize(
+                    lambda x: policy_loss(x[0], x[1], baseline, targets, weights), x0,
+                    jac=lambda x: policy_loss_grad(x[0], x[1], baseline, targets, weights),
+                    method='SLSQP', bounds=bounds,
+                    constraints=policy_constraints(baseline, max_deficit, max_rate_change)
+                )
                 
                 if result.success:
                     G_opt, r_opt = result.x
                     
                     # Calculate predicted outcomes
-                    I_opt = I - alpha_I * (r_opt - r)
-                    NX_opt = NX - alpha_NX * (r_opt - r)
+                    I_opt = I - ALPHA_I * (r_opt - r)
+                    NX_opt = NX - ALPHA_NX * (r_opt - r)
                     C_opt = C + MPC * (G_opt - G)
                     GDP_opt = C_opt + I_opt + G_opt + NX_opt
                     
-                    growth_pred = ((GDP_opt - current_gdp) / current_gdp) * 100
-                    output_gap = (GDP_opt - current_gdp) / current_gdp * 100
-                    inflation_pred = inflation + 0.3 * output_gap - 0.2 * (r_opt - r)
-                    unemployment_pred = unemployment - 0.5 * (growth_pred - 2)
+                    growth_pred, inflation_pred, unemployment_pred = policy_outcomes(G_opt, r_opt, baseline)
                     
                     score_growth = max(0, 100 - abs(growth_pred - target_growth) * 20)
                     score_inflation = max(0, 100 - abs(inflation_pred - target_inflation) * 20)
@@ -509,7 +495,8 @@ with tab1:
                         'r_current': r,
                         'growth_target': target_growth,
                         'inflation_target': target_inflation,
-                        'unemployment_target': target_unemployment
+                        'unemployment_target': target_unemployment,
+                        'nfev': result.nfev
                     }
                     
                     # Monte Carlo Risk Analysis
@@ -517,9 +504,14 @@ with tab1:
                         with st.spinner(f'Running Monte Carlo simulation ({n_sim:,} iterations)...'):
                             mc_results = monte_carlo_risk_analysis(
                                 G_opt, r_opt, C, I, G, NX, r, inflation, unemployment,
-                                target_growth, target_inflation, target_unemployment, n_sim
+                                target_growth, target_inflation, target_unemployment, n_sim, int(mc_seed)
                             )
                             results['mc'] = mc_results
+                            # Common random numbers need far fewer draws for a precise comparison
+                            results['mc_compare'] = compare_policies(
+                                (G, G_opt), (r, r_opt), C, I, G, NX, r, inflation, unemployment,
+                                min(n_sim, 100000), int(mc_seed)
+                            )
                             results['prob_recession'] = mc_results['prob_recession']
                             results['growth_ci_lower'] = mc_results['growth']['ci_lower']
                             results['growth_ci_upper'] = mc_results['growth']['ci_upper']
@@ -568,6 +560,7 @@ with tab1:
                 o3.metric(txt['predicted_unemployment'], f"{results['unemployment_pred']:.2f}%")
             
             st.metric(txt['policy_score'], f"{results['score']:.1f}/100")
+            st.caption(txt['solver_info'].format(nfev=results.get('nfev', 0)))
             
             # Risk Metrics (if Monte Carlo enabled)
             if 'mc' in results:
@@ -581,11 +574,21 @@ with tab1:
                 r3.metric(txt['prob_recession'], f"{results['prob_recession']:.1f}%",
                          delta_color="inverse")
                 
+                if 'mc_compare' in results:
+                    gain = results['mc_compare'].iloc[1]
+                    st.metric(txt['policy_gain'], f"{gain['growth_diff']:+.2f}%",
+                             delta=f"±{1.96 * gain['diff_se']:.3f}%",
+                             delta_color="off",
+                             help=f"Common random numbers: standard error {gain['diff_se']:.4f} "
+                                  f"vs {gain['independent_se']:.4f} with independent draws")
+                
                 # Probability distribution
                 fig_dist = go.Figure()
-                fig_dist.add_trace(go.Histogram(
-                    x=mc['growth']['dist'],
-                    nbinsx=50,
+                hist = mc['growth']['hist']
+                fig_dist.add_trace(go.Bar(
+                    x=(hist['edges'][:-1] + hist['edges'][1:]) / 2,
+                    y=hist['counts'],
+                    width=np.diff(hist['edges']),
                     name='Growth Distribution',
                     marker_color='lightblue',
                     opacity=0.7
@@ -673,6 +676,25 @@ with tab2:
         
         st.plotly_chart(fig, use_container_width=True)
         
+        # Loss surface over the whole feasible policy space
+        G_grid, r_grid, loss_surface = policy_loss_surface(
+            (C, I, G, NX, r, inflation, unemployment),
+            (target_growth, target_inflation, target_unemployment),
+            (w_growth, w_inflation, w_unemployment),
+            (G * 0.8, G * 1.5), (min_rate, max_rate), max_deficit, max_rate_change
+        )
+        opt = st.session_state['optimization_results']
+        
+        fig_heat = go.Figure(go.Heatmap(x=G_grid, y=r_grid, z=loss_surface,
+                                        colorscale='Viridis_r', colorbar=dict(title='Loss')))
+        fig_heat.add_trace(go.Scatter(x=[opt['G_opt']], y=[opt['r_opt']], mode='markers',
+                                      name='Optimal Policy',
+                                      marker=dict(size=15, color='red', symbol='star')))
+        fig_heat.update_layout(title="Policy Loss Surface (blank = violates constraints)",
+                               xaxis_title="Government Spending (Trillion Rp)",
+                               yaxis_title="Interest Rate (%)", height=500)
+        st.plotly_chart(fig_heat, use_container_width=True)
+        
         st.info("""
         **Trade-off Interpretation:**
         - **Growth vs Inflation**: Higher growth typically leads to higher inflation (demand-pull)
@@ -702,48 +724,24 @@ with tab3:
         shock = st.selectbox("Economic Shock", shock_options)
         
         if st.button("Run Dynamic Simulation", type='primary'):
-            time = np.arange(periods)
-            
-            gdp_path = np.zeros(periods)
-            inflation_path = np.zeros(periods)
-            unemployment_path = np.zeros(periods)
-            rate_path = np.zeros(periods)
-            
-            gdp_path[0] = sim_current_gdp
-            inflation_path[0] = sim_inflation
-            unemployment_path[0] = sim_unemployment
-            rate_path[0] = sim_r
+            shock_vectors = {
+                "No Shock (Baseline)": [0, 0, 0],
+                "Demand Shock (-10%)": [-10, 0, 0],
+                "Supply Shock (+5% inflation)": [0, 5, 0],
+                "Financial Crisis (+3% rate)": [0, 0, 3]
+            }
             
-            for t in range(1, periods):
-                if t == 2:
-                    if shock == "Demand Shock (-10%)":
-                        gdp_path[t] = gdp_path[t-1] * 0.9
-                    elif shock == "Supply Shock (+5% inflation)":
-                        inflation_path[t] = inflation_path[t-1] + 5
-                    elif shock == "Financial Crisis (+3% rate)":
-                        rate_path[t] = rate_path[t-1] + 3
-                
-                if t > 2:
-                    inflation_gap = inflation_path[t-1] - sim_target_inflation
-                    output_gap = (gdp_path[t-1] - sim_current_gdp) / sim_current_gdp * 100
-                    rate_path[t] = sim_r + 0.5 * inflation_gap + 0.5 * output_gap
-                    rate_path[t] = np.clip(rate_path[t], sim_min_rate, sim_max_rate)
-                
-                if t > 0:
-                    gdp_growth = -0.5 * (rate_path[t] - rate_path[t-1]) + 0.3 * (inflation_path[t-1] - 2)
-                    gdp_path[t] = gdp_path[t-1] * (1 + gdp_growth/100) if gdp_path[t] == 0 else gdp_path[t]
-                    
-                    if inflation_path[t] == 0:
-                        inflation_path[t] = inflation_path[t-1] + 0.2 * gdp_growth - 0.3 * (rate_path[t] - rate_path[t-1])
-                    
-                    unemployment_path[t] = unemployment_path[t-1] - 0.5 * gdp_growth
+            paths = simulate_taylor_paths(sim_current_gdp, sim_inflation, sim_unemployment, sim_r,
+                                          [shock_vectors[shock]], periods,
+                                          target_inflation=sim_target_inflation,
+                                          min_rate=sim_min_rate, max_rate=sim_max_rate)
             
             st.session_state['simulation_results'] = {
-                'time': time,
-                'gdp': gdp_path,
-                'inflation': inflation_path,
-                'unemployment': unemployment_path,
-                'rate': rate_path
+                'time': np.arange(periods),
+                'gdp': paths['gdp'][0],
+                'inflation': paths['inflation'][0],
+                'unemployment': paths['unemployment'][0],
+                'rate': paths['rate'][0]
             }
     
     with col2:
@@ -806,6 +804,22 @@ with tab4:
                     )
                     st.session_state['stress_result'] = stress_result
                     st.session_state['stress_scenario'] = selected_scenario
+            
+            if st.button(txt['run_library']):
+                # Named scenarios plus a full grid sweep of shock combinations
+                sweep = np.array(np.meshgrid(np.linspace(-20, 10, 31),
+                                             np.linspace(-2, 10, 13),
+                                             np.linspace(-2, 6, 9))).reshape(3, -1).T
+                named = np.array([[p['demand_shock'], p['supply_shock'], p['financial_shock']]
+                                  for p in stress_scenarios.values()])
+                library = stress_test_library(
+                    results['G_opt'], results['r_opt'],
+                    C, I, G, NX, r, inflation, unemployment,
+                    np.vstack([named, sweep])
+                )
+                library.insert(0, 'scenario', [list(stress_scenarios)[i] if i < len(named) else 'Sweep'
+                                               for i in library.index])
+                st.session_state['stress_library'] = library
         
         with col2:
             if 'stress_result' in st.session_state:
@@ -862,6 +876,30 @@ with tab4:
                     st.error(f"🔴 **Low Resilience**: Policy may need adjustment for {scenario_name} scenario")
             else:
                 st.info("Select a stress scenario and click 'Run Stress Test'")
+        
+        if 'stress_library' in st.session_state:
+            library = st.session_state['stress_library']
+            
+            st.markdown(f"#### {txt['library_results']} ({len(library):,} scenarios)")
+            
+            l1, l2, l3 = st.columns(3)
+            l1.metric("Median Resilience", f"{library['resilience_score'].median():.0f}/100")
+            l2.metric("Low-Resilience Scenarios", f"{(library['resilience_score'] < 50).mean() * 100:.1f}%")
+            l3.metric("Worst Drawdown", f"{library['max_drawdown'].min():.1f}%")
+            
+            st.dataframe(library[library['scenario'] != 'Sweep'], use_container_width=True, hide_index=True)
+            
+            worst = library.groupby(['financial_shock', 'demand_shock'])['resilience_score'].min().unstack()
+            fig_library = go.Figure(go.Heatmap(x=worst.columns, y=worst.index, z=worst.values,
+                                               colorscale='RdYlGn', zmin=0, zmax=100,
+                                               colorbar=dict(title='Resilience')))
+            fig_library.update_layout(title=txt['library_heatmap'],
+                                      xaxis_title="Demand Shock (%)",
+                                      yaxis_title="Financial Shock (pp)", height=450)
+            st.plotly_chart(fig_library, use_container_width=True)
+            
+            st.markdown("**10 Most Damaging Scenarios**")
+            st.dataframe(library.tail(10).iloc[::-1], use_container_width=True, hide_index=True)
     else:
         st.info("Run optimization in Tab 1 first")
 
@@ -1,9 +1,19 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import requests
-import time
+import sys
+import os
+
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.world_bank import (INDICATOR_CODES, COUNTRY_CODES, fetch_indicators, start_background_refresh,
+                              snapshot_age)
+from utils.panel_store import (PANEL_PATH, load_panel, update_panel, covers, indicator_frame,
+                               latest_values)
+
+# Keep the full indicator x country matrix warm in the background (no-op if already running)
+start_background_refresh()
 
 st.set_page_config(page_title="Global Economic Dashboard", page_icon="🌍", layout="wide")
 
@@ -59,7 +69,15 @@ T = {
         'loading': "Fetching data from World Bank API...",
         'success': "Data loaded successfully!",
         'error': "Error fetching data. Please try again.",
+        'no_data': "The World Bank publishes no values of this indicator for the selected countries.",
         'source': "Source: World Bank Open Data API",
+        'api_unavailable': "World Bank API is unavailable and no cached copy exists.",
+        'economic_axis': "Economic Indicator",
+        'development_axis': "Development Indicator",
+        'fetch_composite': "Fetch Both Indicators",
+        'cache_offline': "World Bank API is unavailable - showing cached data from {hours:.1f} hours ago.",
+        'cache_stale': "Showing cached data from {hours:.1f} hours ago; refreshing in the background.",
+        'snapshot_info': "Data snapshot refreshed in the background {hours:.1f} hours ago.",
         'latest_year': "Latest Available Year",
         'time_series': "Time Series (2010-2024)",
         'ranking': "Country Rankings",
@@ -119,7 +137,15 @@ T = {
         'loading': "Mengambil data dari API Bank Dunia...",
         'success': "Data berhasil dimuat!",
         'error': "Gagal mengambil data. Silakan coba lagi.",
+        'no_data': "World Bank tidak memublikasikan nilai indikator ini untuk negara yang dipilih.",
         'source': "Sumber: World Bank Open Data API",
+        'api_unavailable': "API Bank Dunia tidak tersedia dan belum ada salinan cache.",
+        'economic_axis': "Indikator Ekonomi",
+        'development_axis': "Indikator Pembangunan",
+        'fetch_composite': "Ambil Kedua Indikator",
+        'cache_offline': "API Bank Dunia tidak tersedia - menampilkan data cache dari {hours:.1f} jam lalu.",
+        'cache_stale': "Menampilkan data cache dari {hours:.1f} jam lalu; diperbarui di latar belakang.",
+        'snapshot_info': "Snapshot data diperbarui di latar belakang {hours:.1f} jam lalu.",
         'latest_year': "Tahun Terakhir Tersedia",
         'time_series': "Runtut Waktu (2010-2024)",
         'ranking': "Peringkat Negara",
@@ -139,72 +165,57 @@ txt = T[lang]
 st.title(txt['title'])
 st.markdown(txt['subtitle'])
 
-# World Bank API Indicator Codes
-INDICATORS = {
-    # Economic
-    txt['gdp_growth']: 'NY.GDP.MKTP.KD.ZG',
-    txt['inflation']: 'FP.CPI.TOTL.ZG',
-    txt['gdp_per_capita']: 'NY.GDP.PCAP.CD',
-    txt['unemployment']: 'SL.UEM.TOTL.ZS',
-    txt['trade_balance']: 'NE.TRD.GNFS.ZS',
-    txt['fdi']: 'BX.KLT.DINV.WD.GD.ZS',
-    # Human Development
-    txt['life_expectancy']: 'SP.DYN.LE00.IN',
-    txt['literacy_rate']: 'SE.ADT.LITR.ZS',
-    txt['school_enrollment']: 'SE.PRM.NENR',
-    txt['infant_mortality']: 'SP.DYN.IMRT.IN',
-    txt['access_electricity']: 'EG.ELC.ACCS.ZS',
-    txt['internet_users']: 'IT.NET.USER.ZS'
-}
+# World Bank API indicator and country codes (shared with the background refresher)
+INDICATORS = {txt[key]: code for key, code in INDICATOR_CODES.items()}
+COUNTRIES = {txt[key]: code for key, code in COUNTRY_CODES.items()}
 
-COUNTRIES = {
-    txt['idn']: 'IDN',
-    txt['mys']: 'MYS',
-    txt['sgp']: 'SGP',
-    txt['tha']: 'THA',
-    txt['vnm']: 'VNM',
-    txt['phl']: 'PHL',
-    txt['chn']: 'CHN',
-    txt['usa']: 'USA',
-    txt['jpn']: 'JPN',
-    txt['kor']: 'KOR',
-    txt['aus']: 'AUS',
-    txt['ind']: 'IND',
-    txt['gbr']: 'GBR',
-    txt['deu']: 'DEU',
-    txt['bra']: 'BRA',
-    txt['mex']: 'MEX',
-    txt['tur']: 'TUR',
-    txt['sau']: 'SAU'
-}
+def fetch_world_bank_panel(indicator_codes, country_codes, start_year=2010, end_year=2024):
+    """Fetch several indicators concurrently over one pooled connection (served from the on-disk cache when possible)"""
+    results = fetch_indicators(indicator_codes, country_codes, start_year, end_year)
+    
+    panel = {}
+    for code, (df, source, age) in results.items():
+        if source == 'offline' and df is not None:
+            st.warning(txt['cache_offline'].format(hours=age / 3600))
+        elif source == 'stale':
+            st.caption(txt['cache_stale'].format(hours=age / 3600))
+        panel[code] = df
+    
+    if any(df is None for df in panel.values()):
+        st.error(txt['api_unavailable'])
+    return panel
 
-def fetch_world_bank_data(indicator_code, country_codes, start_year=2010, end_year=2024):
-    """Fetch data from World Bank API"""
-    try:
-        countries_str = ';'.join(country_codes)
-        url = f"https://api.worldbank.org/v2/country/{countries_str}/indicator/{indicator_code}"
-        params = {
-            'date': f'{start_year}:{end_year}',
-            'format': 'json',
-            'per_page': 1000
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if len(data) > 1 and data[1]:
-                df = pd.DataFrame(data[1])
-                df = df[['country', 'date', 'value']].copy()
-                df.columns = ['Country', 'Year', 'Value']
-                df['Country'] = df['Country'].apply(lambda x: x['value'])
-                df['Year'] = pd.to_numeric(df['Year'])
-                df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
-                return df.dropna()
-        return None
-    except Exception as e:
-        st.error(f"Error: {e}")
-        return None
+def _published_at():
+    return os.path.getmtime(PANEL_PATH) if os.path.exists(PANEL_PATH) else None
+
+# One columnar country x year x indicator panel shared by every tab; reloaded only when
+# the background refresher (or another session) publishes a newer snapshot
+if 'wb_panel' not in st.session_state or st.session_state['wb_panel_published'] != _published_at():
+    st.session_state['wb_panel'] = load_panel()
+    st.session_state['wb_panel_published'] = _published_at()
+
+if snapshot_age() is not None:
+    st.caption(txt['snapshot_info'].format(hours=snapshot_age() / 3600))
+
+def store_indicators(frames, country_codes):
+    """Upsert indicators fetched for country_codes into the persisted panel and the session copy"""
+    panel = update_panel(frames, country_codes)
+    st.session_state['wb_panel'] = panel
+    st.session_state['wb_panel_published'] = _published_at()
+
+def ensure_indicators(indicator_codes, country_codes):
+    """Make the indicators available in the panel; the warm snapshot answers without network I/O"""
+    missing = [code for code in indicator_codes
+               if not covers(st.session_state['wb_panel'], code, country_codes)]
+    if not missing:
+        return True
+    
+    # Only before the first snapshot (or for countries it never fetched) do we go to the API
+    frames = fetch_world_bank_panel(missing, country_codes)
+    if not all(frames[code] is not None and not frames[code].empty for code in missing):
+        return False
+    store_indicators({code: frames[code] for code in missing}, country_codes)
+    return True
 
 # TABS
 tab1, tab2, tab3, tab4 = st.tabs([txt['tab1'], txt['tab2'], txt['tab3'], txt['tab4']])
@@ -233,31 +244,32 @@ with tab1:
                     indicator_code = INDICATORS[selected_indicator]
                     country_codes = [COUNTRIES[c] for c in selected_countries]
                     
-                    df = fetch_world_bank_data(indicator_code, country_codes)
-                    
-                    if df is not None and not df.empty:
-                        st.session_state['eco_data'] = df
+                    if ensure_indicators([indicator_code], country_codes):
+                        st.session_state['eco_code'] = indicator_code
+                        st.session_state['eco_country_codes'] = country_codes
                         st.session_state['eco_indicator'] = selected_indicator
                         st.success(txt['success'])
                     else:
                         st.error(txt['error'])
     
     with col2:
-        if 'eco_data' in st.session_state:
-            df = st.session_state['eco_data']
+        if 'eco_code' in st.session_state:
+            panel = st.session_state['wb_panel']
+            indicator_code = st.session_state['eco_code']
             indicator_name = st.session_state['eco_indicator']
             
             # Time series chart
+            frame = indicator_frame(panel, indicator_code, st.session_state['eco_country_codes'])
             fig = go.Figure()
             
-            for country in df['Country'].unique():
-                country_data = df[df['Country'] == country].sort_values('Year')
+            for country in frame.columns:
                 fig.add_trace(go.Scatter(
-                    x=country_data['Year'],
-                    y=country_data['Value'],
+                    x=frame.index,
+                    y=frame[country],
                     mode='lines+markers',
                     name=country,
-                    line=dict(width=2)
+                    line=dict(width=2),
+                    connectgaps=True
                 ))
             
             fig.update_layout(
@@ -271,27 +283,30 @@ with tab1:
             st.plotly_chart(fig, use_container_width=True)
             
             # Latest year comparison
-            latest_year = df['Year'].max()
-            latest_data = df[df['Year'] == latest_year].sort_values('Value', ascending=False)
+            latest, years = latest_values(panel, [indicator_code], st.session_state['eco_country_codes'])
+            if indicator_code not in years:
+                st.info(txt['no_data'])
+            else:
+                latest_data = latest[indicator_code].dropna().sort_values(ascending=False)
             
-            st.markdown(f"### {txt['latest_year']}: {int(latest_year)}")
+                st.markdown(f"### {txt['latest_year']}: {years[indicator_code]}")
             
-            fig_bar = go.Figure(go.Bar(
-                x=latest_data['Country'],
-                y=latest_data['Value'],
-                marker_color=['red' if c == txt['idn'] else 'steelblue' for c in latest_data['Country']],
-                text=latest_data['Value'].round(2),
-                textposition='outside'
-            ))
+                fig_bar = go.Figure(go.Bar(
+                    x=latest_data.index,
+                    y=latest_data.values,
+                    marker_color=['red' if c == txt['idn'] else 'steelblue' for c in latest_data.index],
+                    text=latest_data.round(2),
+                    textposition='outside'
+                ))
             
-            fig_bar.update_layout(
-                title=f"{indicator_name} Comparison",
-                xaxis_title="Country",
-                yaxis_title=indicator_name,
-                height=400
-            )
+                fig_bar.update_layout(
+                    title=f"{indicator_name} Comparison",
+                    xaxis_title="Country",
+                    yaxis_title=indicator_name,
+                    height=400
+                )
             
-            st.plotly_chart(fig_bar, use_container_width=True)
+                st.plotly_chart(fig_bar, use_container_width=True)
             
             st.caption(txt['source'])
 
@@ -320,31 +335,32 @@ with tab2:
                     indicator_code = INDICATORS[selected_hdi]
                     country_codes = [COUNTRIES[c] for c in selected_countries_hdi]
                     
-                    df = fetch_world_bank_data(indicator_code, country_codes)
-                    
-                    if df is not None and not df.empty:
-                        st.session_state['hdi_data'] = df
+                    if ensure_indicators([indicator_code], country_codes):
+                        st.session_state['hdi_code'] = indicator_code
+                        st.session_state['hdi_country_codes'] = country_codes
                         st.session_state['hdi_indicator'] = selected_hdi
                         st.success(txt['success'])
                     else:
                         st.error(txt['error'])
     
     with col2:
-        if 'hdi_data' in st.session_state:
-            df = st.session_state['hdi_data']
+        if 'hdi_code' in st.session_state:
+            panel = st.session_state['wb_panel']
+            indicator_code = st.session_state['hdi_code']
             indicator_name = st.session_state['hdi_indicator']
             
             # Time series
+            frame = indicator_frame(panel, indicator_code, st.session_state['hdi_country_codes'])
             fig = go.Figure()
             
-            for country in df['Country'].unique():
-                country_data = df[df['Country'] == country].sort_values('Year')
+            for country in frame.columns:
                 fig.add_trace(go.Scatter(
-                    x=country_data['Year'],
-                    y=country_data['Value'],
+                    x=frame.index,
+                    y=frame[country],
                     mode='lines+markers',
                     name=country,
-                    line=dict(width=2)
+                    line=dict(width=2),
+                    connectgaps=True
                 ))
             
             fig.update_layout(
@@ -358,40 +374,32 @@ with tab2:
             st.plotly_chart(fig, use_container_width=True)
             
             # Latest comparison
-            latest_year = df['Year'].max()
-            latest_data = df[df['Year'] == latest_year].sort_values('Value', ascending=False)
+            latest, years = latest_values(panel, [indicator_code], st.session_state['hdi_country_codes'])
+            if indicator_code not in years:
+                st.info(txt['no_data'])
+            else:
+                latest_data = latest[indicator_code].dropna().sort_values(ascending=False)
             
-            st.markdown(f"### {txt['latest_year']}: {int(latest_year)}")
+                st.markdown(f"### {txt['latest_year']}: {years[indicator_code]}")
             
-            st.dataframe(latest_data[['Country', 'Value']].reset_index(drop=True), 
-                        use_container_width=True, hide_index=True)
+                st.dataframe(latest_data.rename('Value').reset_index(), 
+                            use_container_width=True, hide_index=True)
 
 # ========== TAB 3: COUNTRY RANKINGS ==========
 with tab3:
     st.markdown(f"### {txt['ranking']}")
     
-    if 'eco_data' in st.session_state or 'hdi_data' in st.session_state:
-        # Combine latest data from both tabs
-        rankings = []
+    if 'eco_code' in st.session_state or 'hdi_code' in st.session_state:
+        # Latest values of every fetched indicator, read from the shared panel in one slice
+        selections = [prefix for prefix in ('eco', 'hdi') if f'{prefix}_code' in st.session_state]
+        indicator_codes = [st.session_state[f'{prefix}_code'] for prefix in selections]
+        country_codes = sorted(set().union(*[st.session_state[f'{prefix}_country_codes'] for prefix in selections]))
         
-        if 'eco_data' in st.session_state:
-            df_eco = st.session_state['eco_data']
-            latest_year_eco = df_eco['Year'].max()
-            latest_eco = df_eco[df_eco['Year'] == latest_year_eco][['Country', 'Value']]
-            latest_eco.columns = ['Country', st.session_state['eco_indicator']]
-            rankings.append(latest_eco)
+        df_ranking, _ = latest_values(st.session_state['wb_panel'], indicator_codes, country_codes)
         
-        if 'hdi_data' in st.session_state:
-            df_hdi = st.session_state['hdi_data']
-            latest_year_hdi = df_hdi['Year'].max()
-            latest_hdi = df_hdi[df_hdi['Year'] == latest_year_hdi][['Country', 'Value']]
-            latest_hdi.columns = ['Country', st.session_state['hdi_indicator']]
-            rankings.append(latest_hdi)
-        
-        if len(rankings) > 0:
-            df_ranking = rankings[0]
-            for i in range(1, len(rankings)):
-                df_ranking = df_ranking.merge(rankings[i], on='Country', how='outer')
+        if not df_ranking.empty:
+            df_ranking = df_ranking.rename(columns={st.session_state[f'{prefix}_code']: st.session_state[f'{prefix}_indicator']
+                                                    for prefix in selections}).reset_index()
             
             st.dataframe(df_ranking.style.highlight_max(axis=0, color='lightgreen')
                         .highlight_min(axis=0, color='lightcoral'),
@@ -417,18 +425,41 @@ with tab3:
 with tab4:
     st.markdown(f"### {txt['tab4']}")
     
-    if 'eco_data' in st.session_state and 'hdi_data' in st.session_state:
-        df_eco = st.session_state['eco_data']
-        df_hdi = st.session_state['hdi_data']
-        
-        # Get latest year data
-        latest_eco = df_eco[df_eco['Year'] == df_eco['Year'].max()][['Country', 'Value']]
-        latest_eco.columns = ['Country', 'Economic']
-        
-        latest_hdi = df_hdi[df_hdi['Year'] == df_hdi['Year'].max()][['Country', 'Value']]
-        latest_hdi.columns = ['Country', 'Development']
+    # Load both dimensions in one concurrent request batch
+    c1, c2, c3 = st.columns([1, 1, 2])
+    composite_eco = c1.selectbox(txt['economic_axis'], economic_indicators, key='composite_eco')
+    composite_hdi = c2.selectbox(txt['development_axis'], hdi_indicators, key='composite_hdi')
+    composite_countries = c3.multiselect(
+        txt['select_countries'],
+        list(COUNTRIES.keys()),
+        default=[txt['idn'], txt['mys'], txt['sgp'], txt['tha'], txt['vnm']],
+        key='composite_countries'
+    )
+    
+    if st.button(txt['fetch_composite'], type='primary', key='composite_fetch'):
+        if len(composite_countries) > 0:
+            with st.spinner(txt['loading']):
+                eco_code, hdi_code = INDICATORS[composite_eco], INDICATORS[composite_hdi]
+                country_codes = [COUNTRIES[c] for c in composite_countries]
+                
+                if ensure_indicators([eco_code, hdi_code], country_codes):
+                    for prefix, code, label in (('eco', eco_code, composite_eco), ('hdi', hdi_code, composite_hdi)):
+                        st.session_state[f'{prefix}_code'] = code
+                        st.session_state[f'{prefix}_country_codes'] = country_codes
+                        st.session_state[f'{prefix}_indicator'] = label
+                    st.success(txt['success'])
+                else:
+                    st.error(txt['error'])
+    
+    if 'eco_code' in st.session_state and 'hdi_code' in st.session_state:
+        # Latest year data for countries present in both selections
+        country_codes = sorted(set(st.session_state['eco_country_codes']) & set(st.session_state['hdi_country_codes']))
+        latest, _ = latest_values(st.session_state['wb_panel'],
+                                  [st.session_state['eco_code'], st.session_state['hdi_code']], country_codes)
         
-        df_composite = latest_eco.merge(latest_hdi, on='Country')
+        df_composite = latest.rename(columns={st.session_state['eco_code']: 'Economic',
+                                              st.session_state['hdi_code']: 'Development'})
+        df_composite = df_composite.reindex(columns=['Economic', 'Development']).dropna().reset_index()
         
         # Scatter plot
         fig = go.Figure()
@@ -465,7 +496,7 @@ with tab4:
         - Bottom-left: Needs improvement in both dimensions
         """)
     else:
-        st.info("Fetch data from both Economic and Human Development tabs for composite analysis")
+        st.info("Fetch both indicators above, or fetch data from the Economic and Human Development tabs, for composite analysis")
 
 # --- STORY & USE CASES ---
 if 'story_title' in txt:
@@ -2,6 +2,16 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
+import sys
+import os
+import io
+import time
+
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.mcda import (load_regions, decision_matrix, benefit_mask, minmax_normalize, weighted_sum,
+                        rank_stability, pareto_front, topsis, promethee_ii, ahp_weights, pairwise_from_judgments)
 
 st.set_page_config(page_title="Investment Location Finder", page_icon="📍", layout="wide")
 
@@ -24,9 +34,20 @@ T = {
         'w_poverty': "Priority: Low Poverty Rate %",
         'total_w': "Total Weight (Must be 100%)",
         'candidates': "🏙️ Candidate Regions (Edit Data)",
+        'data_source': "Data Source",
+        'src_sample': "Sample regions (editable)",
+        'src_upload': "Upload dataset (CSV / Parquet)",
+        'src_synthetic': "Synthetic kabupaten/kota",
+        'upload_regions': "Region file with a Region column and the 8 criteria columns",
+        'n_synthetic': "Number of Regions",
+        'regions_loaded': "{n:,} regions loaded (showing the first 100)",
+        'pareto_filter': "Pareto filter: drop regions dominated on every criterion before ranking",
+        'pareto_info': "Pareto front: {kept:,} of {total:,} regions are non-dominated",
+        'page': "Page",
+        'page_info': "Showing ranks {first:,}-{last:,} of {total:,}",
+        'top_chart': "Top {k} regions shown",
         'rank_res': "🏆 Optimization Ranking",
         'best_choice': "Best Choice:",
-        'score': "Composite Score (0-100)",
         'details': "Analysis Details",
         'labor': "Labor Cost",
         'land': "Land Price",
@@ -41,6 +62,42 @@ T = {
         'insight_infra': "Since you prioritize **Infrastructure**, this region's developed logistics drove the score up.",
         'insight_education': "Since you prioritize **Skilled Workforce**, this region's high education level is a major advantage.",
         'viz_title': "Weighted Score Breakdown by Region",
+        'robust_title': "🎲 Rank Robustness (Weight Sensitivity)",
+        'robust_desc': "Weights are never known exactly. Sample many weight vectors around your sliders (Dirichlet) and see how often each region stays on top.",
+        'n_weight_samples': "Weight Samples",
+        'concentration': "Confidence in Weights (higher = closer to sliders)",
+        'run_robust': "🎲 Run Sensitivity Analysis",
+        'p_first': "P(Rank 1) %",
+        'mean_rank': "Mean Rank",
+        'p_top3': "P(Top 3) %",
+        'rank_dist': "Rank Distribution (% of samples)",
+        'samples_capped': "{n:,} weight samples used for {regions:,} regions (capped to keep the run to a few seconds)",
+        'rank': "Rank",
+        'method': "Ranking Method",
+        'm_wsm': "Weighted Sum (SAW)",
+        'm_topsis': "TOPSIS (closeness to ideal)",
+        'm_promethee': "PROMETHEE II (pairwise outranking)",
+        'score_wsm': "Composite Score (0-100)",
+        'score_topsis': "TOPSIS Closeness (0-100)",
+        'score_promethee': "Net Flow (-100 to 100)",
+        'promethee_limit': "PROMETHEE II compares every pair of regions, so it is limited to {max:,} regions ({n:,} here). Enable the Pareto filter or pick another method.",
+        'ahp_title': "⚖️ Derive Weights with AHP",
+        'use_ahp': "Use AHP weights instead of the sliders",
+        'ahp_desc': "Compare each pair of criteria: 0 = equally important, +k = the first is k+1 times as important, -k = the second is.",
+        'ahp_a': "Criterion A",
+        'ahp_b': "Criterion B",
+        'ahp_pref': "Preference (A vs B)",
+        'ahp_weight': "AHP Weight %",
+        'ahp_cr': "Consistency Ratio (CR): {cr:.3f}",
+        'ahp_inconsistent': "CR above 0.10: the comparisons contradict each other; consider revising them.",
+        'compare_title': "🔀 Method Comparison",
+        'compare_desc': "Rank the same regions with all three methods and see where they agree. PROMETHEE II uses linear preferences (indifference below 5%, strict preference above 30% of each criterion's range).",
+        'run_compare': "🔀 Compare Methods",
+        'compare_time': "Scored {n:,} regions with 3 methods in {sec:.2f}s",
+        'rank_corr': "Spearman Rank Correlation Between Methods",
+        'winners_agree': "All methods pick **{winner}**.",
+        'winners_differ': "The methods disagree on the winner: {winners}.",
+        'robust_wsm_note': "The sensitivity analysis re-scores with the weighted sum.",
         'story_title': "📚 Story & Use Cases: Investment Locator",
         'story_meaning': "**What is this?**\nA Decision Support System (MCDA) that ranks locations based on your specific business priorities using 8 economic indicators.",
         'story_insight': "**Key Insight:**\nThere is no 'Best Place' for everyone. A Garment factory needs cheap labor (Central Java), while a Tech Firm needs infrastructure + skilled workforce (Jakarta). Weights matter!",
@@ -63,9 +120,20 @@ T = {
         'w_poverty': "Prioritas: Tingkat Kemiskinan Rendah %",
         'total_w': "Total Bobot (Harus 100%)",
         'candidates': "🏙️ Wilayah Kandidat (Edit Data)",
+        'data_source': "Sumber Data",
+        'src_sample': "Contoh wilayah (dapat diedit)",
+        'src_upload': "Unggah dataset (CSV / Parquet)",
+        'src_synthetic': "Kabupaten/kota sintetis",
+        'upload_regions': "File wilayah dengan kolom Region dan 8 kolom kriteria",
+        'n_synthetic': "Jumlah Wilayah",
+        'regions_loaded': "{n:,} wilayah dimuat (menampilkan 100 pertama)",
+        'pareto_filter': "Filter Pareto: buang wilayah yang kalah di semua kriteria sebelum pemeringkatan",
+        'pareto_info': "Front Pareto: {kept:,} dari {total:,} wilayah tidak terdominasi",
+        'page': "Halaman",
+        'page_info': "Menampilkan peringkat {first:,}-{last:,} dari {total:,}",
+        'top_chart': "Menampilkan {k} wilayah teratas",
         'rank_res': "🏆 Peringkat Optimasi",
         'best_choice': "Pilihan Terbaik:",
-        'score': "Skor Komposit (0-100)",
         'details': "Detail Analisis",
         'labor': "Biaya Tenaga Kerja",
         'land': "Harga Tanah",
@@ -80,6 +148,42 @@ T = {
         'insight_infra': "Karena Anda memprioritaskan **Infrastruktur**, logistik maju di wilayah ini mendongkrak skor.",
         'insight_education': "Karena Anda memprioritaskan **Tenaga Kerja Terampil**, tingkat pendidikan tinggi di wilayah ini adalah keunggulan utama.",
         'viz_title': "Rincian Skor Terbobot per Wilayah",
+        'robust_title': "🎲 Ketahanan Peringkat (Sensitivitas Bobot)",
+        'robust_desc': "Bobot tidak pernah diketahui secara pasti. Ambil banyak sampel vektor bobot di sekitar slider Anda (Dirichlet) dan lihat seberapa sering setiap wilayah tetap di puncak.",
+        'n_weight_samples': "Jumlah Sampel Bobot",
+        'concentration': "Keyakinan pada Bobot (makin tinggi = makin dekat ke slider)",
+        'run_robust': "🎲 Jalankan Analisis Sensitivitas",
+        'p_first': "P(Peringkat 1) %",
+        'mean_rank': "Rata-rata Peringkat",
+        'p_top3': "P(3 Besar) %",
+        'rank_dist': "Distribusi Peringkat (% sampel)",
+        'samples_capped': "{n:,} sampel bobot dipakai untuk {regions:,} wilayah (dibatasi agar proses tetap beberapa detik)",
+        'rank': "Peringkat",
+        'method': "Metode Pemeringkatan",
+        'm_wsm': "Penjumlahan Terbobot (SAW)",
+        'm_topsis': "TOPSIS (kedekatan ke solusi ideal)",
+        'm_promethee': "PROMETHEE II (outranking berpasangan)",
+        'score_wsm': "Skor Komposit (0-100)",
+        'score_topsis': "Kedekatan TOPSIS (0-100)",
+        'score_promethee': "Net Flow (-100 s.d. 100)",
+        'promethee_limit': "PROMETHEE II membandingkan setiap pasangan wilayah, sehingga dibatasi {max:,} wilayah (di sini {n:,}). Aktifkan filter Pareto atau pilih metode lain.",
+        'ahp_title': "⚖️ Turunkan Bobot dengan AHP",
+        'use_ahp': "Gunakan bobot AHP sebagai pengganti slider",
+        'ahp_desc': "Bandingkan setiap pasangan kriteria: 0 = sama penting, +k = yang pertama k+1 kali lebih penting, -k = yang kedua.",
+        'ahp_a': "Kriteria A",
+        'ahp_b': "Kriteria B",
+        'ahp_pref': "Preferensi (A vs B)",
+        'ahp_weight': "Bobot AHP %",
+        'ahp_cr': "Rasio Konsistensi (CR): {cr:.3f}",
+        'ahp_inconsistent': "CR di atas 0,10: perbandingan saling bertentangan; pertimbangkan untuk merevisinya.",
+        'compare_title': "🔀 Perbandingan Metode",
+        'compare_desc': "Peringkatkan wilayah yang sama dengan ketiga metode dan lihat di mana hasilnya sepakat. PROMETHEE II memakai preferensi linear (indiferen di bawah 5%, preferensi penuh di atas 30% rentang tiap kriteria).",
+        'run_compare': "🔀 Bandingkan Metode",
+        'compare_time': "{n:,} wilayah dinilai dengan 3 metode dalam {sec:.2f} detik",
+        'rank_corr': "Korelasi Peringkat Spearman Antar Metode",
+        'winners_agree': "Semua metode memilih **{winner}**.",
+        'winners_differ': "Metode berbeda pendapat soal pemenang: {winners}.",
+        'robust_wsm_note': "Analisis sensitivitas menilai ulang dengan penjumlahan terbobot.",
         'story_title': "📚 Cerita & Kasus Penggunaan: Pencari Lokasi",
         'story_meaning': "**Apa artinya ini?**\nSistem Pendukung Keputusan (MCDA) yang meranking lokasi berdasarkan prioritas bisnis spesifik Anda menggunakan 8 indikator ekonomi.",
         'story_insight': "**Wawasan Utama:**\nTidak ada 'Tempat Terbaik' untuk semua. Pabrik Tekstil butuh upah murah (Jateng), sementara Startup butuh infrastruktur + SDM terampil (Jakarta). Bobot itu penting!",
@@ -92,6 +196,73 @@ T = {
 
 txt = T[lang]
 
+# Criteria spec: data column, direction, weight slider label, chart label and default weight
+CRITERIA = [
+    {'key': 'labor', 'column': 'UMR (Rp Juta)', 'benefit': False, 'weight_label': 'w_labor', 'default': 15},
+    {'key': 'land', 'column': 'Land Price (Rp Juta/m2)', 'benefit': False, 'weight_label': 'w_land', 'default': 10},
+    {'key': 'infra', 'column': 'Infra Score (0-100)', 'benefit': True, 'weight_label': 'w_infra', 'default': 15},
+    {'key': 'gdp', 'column': 'GDP (Triliun Rp)', 'benefit': True, 'weight_label': 'w_market', 'default': 15},
+    {'key': 'tax', 'column': 'Tax Rate (%)', 'benefit': False, 'weight_label': 'w_tax', 'default': 10},
+    {'key': 'education', 'column': 'Education Index (0-100)', 'benefit': True, 'weight_label': 'w_education', 'default': 15},
+    {'key': 'logistics', 'column': 'Logistics Score (0-100)', 'benefit': True, 'weight_label': 'w_logistics', 'default': 10},
+    {'key': 'poverty', 'column': 'Poverty Rate (%)', 'benefit': False, 'weight_label': 'w_poverty', 'default': 10}
+]
+CRITERION_INDEX = {c['key']: i for i, c in enumerate(CRITERIA)}
+
+PAGE_SIZE = 25
+TOP_CHART = 20
+ROBUST_BUDGET = 200_000_000     # Sampled scores (weight samples x regions) per sensitivity run
+METHODS = ['wsm', 'topsis', 'promethee']
+PROMETHEE_MAX = 10_000          # Pairwise methods cost O(n^2); larger sets need the Pareto filter
+
+@st.cache_data
+def load_uploaded_regions(content, name):
+    """Parse an uploaded region file once per distinct upload"""
+    source = io.BytesIO(content)
+    source.name = name
+    return load_regions(source, CRITERIA)
+
+@st.cache_data
+def synthetic_regions(n, seed=0):
+    """Synthetic kabupaten/kota with plausibly correlated criteria (a shared development factor)"""
+    rng = np.random.default_rng(seed)
+    dev = rng.uniform(0, 1, n)
+    noise = lambda scale: rng.normal(0, scale, n)
+    return pd.DataFrame({
+        'Region': [f"Kab./Kota {i + 1:05d}" for i in range(n)],
+        'UMR (Rp Juta)': np.clip(2.0 + 3.0 * dev + noise(0.3), 1.8, 5.5).round(2),
+        'Land Price (Rp Juta/m2)': np.exp(-1.5 + 3.0 * dev + noise(0.4)).round(2),
+        'Infra Score (0-100)': np.clip(40 + 55 * dev + noise(6), 20, 99).round(0),
+        'GDP (Triliun Rp)': np.exp(1.5 + 4.0 * dev + noise(0.6)).round(1),
+        'Tax Rate (%)': rng.choice([8, 9, 10, 11, 12], n),
+        'Education Index (0-100)': np.clip(50 + 40 * dev + noise(5), 30, 95).round(0),
+        'Logistics Score (0-100)': np.clip(40 + 50 * dev + noise(8), 20, 98).round(0),
+        'Poverty Rate (%)': np.clip(22 - 16 * dev + noise(2.5), 2, 35).round(1)
+    })
+
+@st.cache_data
+def non_dominated(X):
+    """Cached Pareto mask (independent of the weights, so slider changes reuse it)"""
+    return pareto_front(X, benefit_mask(CRITERIA))
+
+@st.cache_data
+def method_scores(method, X, norm, weights, keep):
+    """Cached scores of the ranked regions (keep mask) under one method.
+
+    TOPSIS is scored against the full set's ideal and anti-ideal points, like the min-max
+    ranges; PROMETHEE II flows are relative to the regions being ranked.
+    """
+    if method == 'topsis':
+        return topsis(X, benefit_mask(CRITERIA), weights)[keep] * 100
+    if method == 'promethee':
+        return promethee_ii(norm[keep], weights) * 100
+    return weighted_sum(norm[keep], weights)[0]
+
+@st.cache_data
+def weight_sensitivity(norm, weights, n_samples, concentration):
+    """Cached Dirichlet rank-stability run (chunked inside utils.mcda)"""
+    return rank_stability(norm, weights, n_samples, concentration)
+
 st.title(txt['title'])
 st.markdown(txt['subtitle'])
 
@@ -101,22 +272,45 @@ col1, col2 = st.columns([1, 2])
 with col1:
     st.subheader(txt['criteria'])
     
-    # 8 Criteria with sliders
-    w_labor = st.slider(txt['w_labor'], 0, 100, 15, 5)
-    w_land = st.slider(txt['w_land'], 0, 100, 10, 5)
-    w_infra = st.slider(txt['w_infra'], 0, 100, 15, 5)
-    w_market = st.slider(txt['w_market'], 0, 100, 15, 5)
-    w_tax = st.slider(txt['w_tax'], 0, 100, 10, 5)
-    w_education = st.slider(txt['w_education'], 0, 100, 15, 5)
-    w_logistics = st.slider(txt['w_logistics'], 0, 100, 10, 5)
-    w_poverty = st.slider(txt['w_poverty'], 0, 100, 10, 5)
+    # One slider per criterion, in spec order
+    weights = np.array([st.slider(txt[c['weight_label']], 0, 100, c['default'], 5) for c in CRITERIA])
     
-    total_weight = w_labor + w_land + w_infra + w_market + w_tax + w_education + w_logistics + w_poverty
+    total_weight = int(weights.sum())
     
     if total_weight != 100:
         st.warning(f"⚠️ {txt['total_w']}: **{total_weight}%**. Please adjust to 100%.")
     else:
         st.success(f"✅ {txt['total_w']}: **100%**")
+    
+    # AHP: weights from pairwise judgments (+k means A is k+1 times as important as B)
+    with st.expander(txt['ahp_title']):
+        use_ahp = st.checkbox(txt['use_ahp'])
+        st.caption(txt['ahp_desc'])
+        pairs = [(i, j) for i in range(len(CRITERIA)) for j in range(i + 1, len(CRITERIA))]
+        judgments = st.data_editor(
+            pd.DataFrame({
+                txt['ahp_a']: [txt[CRITERIA[i]['key']] for i, _ in pairs],
+                txt['ahp_b']: [txt[CRITERIA[j]['key']] for _, j in pairs],
+                txt['ahp_pref']: 0
+            }),
+            column_config={txt['ahp_pref']: st.column_config.NumberColumn(min_value=-8, max_value=8, step=1)},
+            disabled=[txt['ahp_a'], txt['ahp_b']], hide_index=True, key='ahp_editor'
+        )[txt['ahp_pref']].fillna(0).to_numpy()
+        
+        pairwise = pairwise_from_judgments(len(CRITERIA), {
+            pair: v + 1 if v >= 0 else 1 / (1 - v) for pair, v in zip(pairs, judgments)
+        })
+        ahp_w, ahp_cr = ahp_weights(pairwise)
+        st.dataframe(pd.DataFrame({'Criterion': [txt[c['key']] for c in CRITERIA], txt['ahp_weight']: ahp_w * 100})
+                     .style.format({txt['ahp_weight']: '{:.1f}'}), hide_index=True, use_container_width=True)
+        st.caption(txt['ahp_cr'].format(cr=ahp_cr))
+        if ahp_cr > 0.1:
+            st.warning(txt['ahp_inconsistent'])
+    
+    if use_ahp:
+        weights = ahp_w * 100
+    
+    method = st.radio(txt['method'], METHODS, format_func=lambda x: txt[f'm_{x}'])
 
 # --- 2. DATA GENERATION & LOGIC ---
 # Enhanced data with 8 parameters
@@ -135,111 +329,94 @@ df = pd.DataFrame(data)
 
 with col2:
     st.subheader(txt['candidates'])
-    # Make data editable
-    df = st.data_editor(df, use_container_width=True, num_rows="dynamic", key='editor_mcda')
+    source = st.radio(txt['data_source'], ['sample', 'upload', 'synthetic'],
+                      format_func=lambda x: txt[f'src_{x}'], horizontal=True)
+    
+    if source == 'sample':
+        # Make data editable
+        df = st.data_editor(df, use_container_width=True, num_rows="dynamic", key='editor_mcda')
+    else:
+        # Large candidate sets: bulk load and show a read-only preview instead of the editor
+        df = None
+        if source == 'upload':
+            uploaded = st.file_uploader(txt['upload_regions'], type=['csv', 'parquet'])
+            if uploaded is not None:
+                try:
+                    df = load_uploaded_regions(uploaded.getvalue(), uploaded.name)
+                except ValueError as e:
+                    st.error(str(e))
+        else:
+            df = synthetic_regions(st.select_slider(txt['n_synthetic'], [514, 5_000, 20_000, 50_000], 514))
+        
+        if df is not None:
+            st.caption(txt['regions_loaded'].format(n=len(df)))
+            st.dataframe(df.head(100), use_container_width=True, hide_index=True, height=250)
+    
+    use_pareto = st.checkbox(txt['pareto_filter'], value=source != 'sample')
 
-    if total_weight == 100:
+    if (total_weight == 100 or use_ahp) and df is not None and len(df) > 0:
         st.divider()
         st.subheader(txt['rank_res'])
         
         # --- MCDA LOGIC (Min-Max Normalization) ---
-        df_norm = df.copy()
-        
-        # Normalize each criterion
-        # COST criteria (Lower is better): (Max - Value) / (Max - Min)
-        # BENEFIT criteria (Higher is better): (Value - Min) / (Max - Min)
-        
-        # 1. UMR (Cost)
-        min_val, max_val = df['UMR (Rp Juta)'].min(), df['UMR (Rp Juta)'].max()
-        df_norm['Norm_Labor'] = (max_val - df['UMR (Rp Juta)']) / (max_val - min_val) if max_val != min_val else 0.5
-        
-        # 2. Land (Cost)
-        min_val, max_val = df['Land Price (Rp Juta/m2)'].min(), df['Land Price (Rp Juta/m2)'].max()
-        df_norm['Norm_Land'] = (max_val - df['Land Price (Rp Juta/m2)']) / (max_val - min_val) if max_val != min_val else 0.5
-        
-        # 3. Infra (Benefit)
-        min_val, max_val = df['Infra Score (0-100)'].min(), df['Infra Score (0-100)'].max()
-        df_norm['Norm_Infra'] = (df['Infra Score (0-100)'] - min_val) / (max_val - min_val) if max_val != min_val else 0.5
+        # Benefit criteria: (Value - Min) / (Max - Min); cost criteria: (Max - Value) / (Max - Min),
+        # computed for every region and criterion in one broadcast
+        X = decision_matrix(df, CRITERIA)
+        norm = minmax_normalize(X, benefit_mask(CRITERIA))
         
-        # 4. GDP (Benefit)
-        min_val, max_val = df['GDP (Triliun Rp)'].min(), df['GDP (Triliun Rp)'].max()
-        df_norm['Norm_Market'] = (df['GDP (Triliun Rp)'] - min_val) / (max_val - min_val) if max_val != min_val else 0.5
+        # Dominated regions cannot outrank their dominator under any weights; the ranges
+        # above still come from the full set, so pruning leaves every score unchanged
+        if use_pareto:
+            keep = non_dominated(X)
+            st.caption(txt['pareto_info'].format(kept=int(keep.sum()), total=len(df)))
+        else:
+            keep = np.ones(len(df), dtype=bool)
+        df = df[keep].reset_index(drop=True)
         
-        # 5. Tax (Cost)
-        min_val, max_val = df['Tax Rate (%)'].min(), df['Tax Rate (%)'].max()
-        df_norm['Norm_Tax'] = (max_val - df['Tax Rate (%)']) / (max_val - min_val) if max_val != min_val else 0.5
+        if method == 'promethee' and len(df) > PROMETHEE_MAX:
+            st.warning(txt['promethee_limit'].format(max=PROMETHEE_MAX, n=len(df)))
+            method = 'wsm'
         
-        # 6. Education (Benefit)
-        min_val, max_val = df['Education Index (0-100)'].min(), df['Education Index (0-100)'].max()
-        df_norm['Norm_Education'] = (df['Education Index (0-100)'] - min_val) / (max_val - min_val) if max_val != min_val else 0.5
+        # Full-set matrices stay around for the cached scorers; the rest of the page uses the ranked rows
+        X_all, norm_all, norm = X, norm, norm[keep]
+        scores = method_scores(method, X_all, norm_all, weights, keep)
+        contributions = weighted_sum(norm, weights)[1]
         
-        # 7. Logistics (Benefit)
-        min_val, max_val = df['Logistics Score (0-100)'].min(), df['Logistics Score (0-100)'].max()
-        df_norm['Norm_Logistics'] = (df['Logistics Score (0-100)'] - min_val) / (max_val - min_val) if max_val != min_val else 0.5
-        
-        # 8. Poverty (Cost)
-        min_val, max_val = df['Poverty Rate (%)'].min(), df['Poverty Rate (%)'].max()
-        df_norm['Norm_Poverty'] = (max_val - df['Poverty Rate (%)']) / (max_val - min_val) if max_val != min_val else 0.5
-        
-        # Apply Weights
-        df_norm['Score'] = (
-            df_norm['Norm_Labor'] * (w_labor/100) +
-            df_norm['Norm_Land'] * (w_land/100) +
-            df_norm['Norm_Infra'] * (w_infra/100) +
-            df_norm['Norm_Market'] * (w_market/100) +
-            df_norm['Norm_Tax'] * (w_tax/100) +
-            df_norm['Norm_Education'] * (w_education/100) +
-            df_norm['Norm_Logistics'] * (w_logistics/100) +
-            df_norm['Norm_Poverty'] * (w_poverty/100)
-        ) * 100
-        
-        df_norm['Score'] = df_norm['Score'].round(1)
+        df_norm = df.copy()
+        df_norm['Score'] = np.round(scores, 1)
         
         # Sort
-        df_sorted = df_norm.sort_values('Score', ascending=False).reset_index(drop=True)
+        order = df_norm['Score'].sort_values(ascending=False).index
+        df_sorted = df_norm.loc[order].reset_index(drop=True)
         winner = df_sorted.iloc[0]['Region']
+        winner_norm = norm[df_norm.index.get_loc(order[0])]
         
         # Display Winner
-        st.success(f"### 🥇 {txt['best_choice']} {winner} ({txt['score']}: {df_sorted.iloc[0]['Score']})") 
+        st.success(f"### 🥇 {txt['best_choice']} {winner} ({txt[f'score_{method}']}: {df_sorted.iloc[0]['Score']})") 
         
         # Explanation
         reason = txt['insight'].format(winner=winner)
-        if w_labor > 20 and df_sorted.iloc[0]['Norm_Labor'] > 0.7:
-             reason += "\n\n" + txt['insight_labor']
-        if w_infra > 20 and df_sorted.iloc[0]['Norm_Infra'] > 0.7:
-             reason += "\n\n" + txt['insight_infra']
-        if w_education > 20 and df_sorted.iloc[0]['Norm_Education'] > 0.7:
-             reason += "\n\n" + txt['insight_education']
+        for key in ('labor', 'infra', 'education'):
+            if weights[CRITERION_INDEX[key]] > 20 and winner_norm[CRITERION_INDEX[key]] > 0.7:
+                reason += "\n\n" + txt[f'insight_{key}']
              
         st.info(reason)
         
         # --- VISUALIZATION (Plotly Stacked Bar) ---
-        viz_data = []
-        for index, row in df_norm.iterrows():
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['labor'], 'Contribution': row['Norm_Labor'] * w_labor})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['land'], 'Contribution': row['Norm_Land'] * w_land})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['infra'], 'Contribution': row['Norm_Infra'] * w_infra})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['gdp'], 'Contribution': row['Norm_Market'] * w_market})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['tax'], 'Contribution': row['Norm_Tax'] * w_tax})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['education'], 'Contribution': row['Norm_Education'] * w_education})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['logistics'], 'Contribution': row['Norm_Logistics'] * w_logistics})
-            viz_data.append({'Region': row['Region'], 'Criteria': txt['poverty'], 'Contribution': row['Norm_Poverty'] * w_poverty})
-            
-        df_viz = pd.DataFrame(viz_data)
-        
-        # Create stacked bar chart
+        # One trace per criterion, straight from the contribution matrix (top regions only)
+        top = order[:TOP_CHART]
+        if len(order) > TOP_CHART:
+            st.caption(txt['top_chart'].format(k=TOP_CHART))
         fig = go.Figure()
         
-        criteria_list = [txt['labor'], txt['land'], txt['infra'], txt['gdp'], txt['tax'], txt['education'], txt['logistics'], txt['poverty']]
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f']
         
-        for i, criteria in enumerate(criteria_list):
-            df_criteria = df_viz[df_viz['Criteria'] == criteria]
+        for i, criterion in enumerate(CRITERIA):
             fig.add_trace(go.Bar(
-                name=criteria,
-                x=df_criteria['Region'],
-                y=df_criteria['Contribution'],
-                marker_color=colors[i]
+                name=txt[criterion['key']],
+                x=df_norm.loc[top, 'Region'],
+                y=contributions[top, i],
+                marker_color=colors[i % len(colors)]
             ))
         
         fig.update_layout(
@@ -258,7 +435,97 @@ with col2:
         ranking_df = df_sorted[['Region', 'Score']].copy()
         ranking_df['Rank'] = range(1, len(ranking_df) + 1)
         ranking_df = ranking_df[['Rank', 'Region', 'Score']]
-        st.dataframe(ranking_df, use_container_width=True, hide_index=True)
+        
+        # Paginated, so tens of thousands of rows never go to the browser at once
+        n_pages = -(-len(ranking_df) // PAGE_SIZE)
+        page = st.number_input(txt['page'], 1, n_pages, 1) if n_pages > 1 else 1
+        first = (page - 1) * PAGE_SIZE
+        if n_pages > 1:
+            st.caption(txt['page_info'].format(first=first + 1, last=min(first + PAGE_SIZE, len(ranking_df)),
+                                               total=len(ranking_df)))
+        st.dataframe(ranking_df.iloc[first:first + PAGE_SIZE], use_container_width=True, hide_index=True)
+        
+        # --- METHOD COMPARISON ---
+        st.divider()
+        st.subheader(txt['compare_title'])
+        st.caption(txt['compare_desc'])
+        
+        if st.button(txt['run_compare']):
+            st.session_state['mcda_compare'] = True
+        
+        if st.session_state.get('mcda_compare'):
+            compared = [m for m in METHODS if m != 'promethee' or len(df) <= PROMETHEE_MAX]
+            if len(compared) < len(METHODS):
+                st.warning(txt['promethee_limit'].format(max=PROMETHEE_MAX, n=len(df)))
+            
+            start = time.perf_counter()
+            all_scores = pd.DataFrame({txt[f'm_{m}']: method_scores(m, X_all, norm_all, weights, keep) for m in compared})
+            st.caption(txt['compare_time'].format(n=len(df), sec=time.perf_counter() - start))
+            
+            ranks = all_scores.rank(ascending=False, method='min').astype(int)
+            winners = df['Region'].values[all_scores.to_numpy().argmax(axis=0)]
+            if len(set(winners)) == 1:
+                st.success(txt['winners_agree'].format(winner=winners[0]))
+            else:
+                st.warning(txt['winners_differ'].format(
+                    winners=', '.join(f"{m}: **{w}**" for m, w in zip(all_scores.columns, winners))))
+            
+            # Top regions of the selected method with their rank under every method
+            compare_df = pd.concat([df[['Region']], ranks], axis=1).loc[order[:PAGE_SIZE]]
+            st.dataframe(compare_df, use_container_width=True, hide_index=True)
+            
+            corr = ranks.corr(method='spearman')
+            fig_corr = go.Figure(go.Heatmap(z=corr.values, x=corr.columns, y=corr.index, zmin=-1, zmax=1,
+                                            colorscale='RdBu', text=np.round(corr.values, 3), texttemplate='%{text}'))
+            fig_corr.update_layout(title=txt['rank_corr'], height=350)
+            st.plotly_chart(fig_corr, use_container_width=True)
+        
+        # --- RANK ROBUSTNESS ---
+        st.divider()
+        st.subheader(txt['robust_title'])
+        st.caption(txt['robust_desc'])
+        if method != 'wsm':
+            st.caption(txt['robust_wsm_note'])
+        
+        rc1, rc2 = st.columns(2)
+        n_weight_samples = rc1.select_slider(txt['n_weight_samples'], [10_000, 50_000, 100_000, 200_000, 500_000], 200_000)
+        concentration = rc2.slider(txt['concentration'], 10, 500, 100, 10)
+        
+        if st.button(txt['run_robust']):
+            st.session_state['mcda_robust'] = True
+        
+        if st.session_state.get('mcda_robust'):
+            # Fewer samples for large candidate sets, so the run time stays bounded
+            n_used = min(n_weight_samples, max(10_000, ROBUST_BUDGET // len(df)))
+            if n_used < n_weight_samples:
+                st.caption(txt['samples_capped'].format(n=n_used, regions=len(df)))
+            robust = weight_sensitivity(norm, weights, n_used, concentration)
+            counts = robust['rank_counts']
+            
+            robust_df = pd.DataFrame({
+                'Region': df['Region'].values,
+                txt['p_first']: robust['p_first'] * 100,
+                txt['p_top3']: counts[:, :3].sum(axis=1) / robust['n_samples'] * 100,
+                txt['mean_rank']: robust['mean_rank']
+            }).sort_values(txt['mean_rank'])
+            st.dataframe(robust_df.style.format({txt['p_first']: '{:.1f}', txt['p_top3']: '{:.1f}', txt['mean_rank']: '{:.2f}'}),
+                         use_container_width=True, hide_index=True)
+            
+            # Rank distribution heatmap (last column pools the ranks beyond those shown)
+            shown = robust_df.index[:min(len(robust_df), 30)]
+            rank_labels = [str(r + 1) for r in range(counts.shape[1])]
+            if counts.shape[1] < len(df):
+                rank_labels[-1] = f"{counts.shape[1]}+"
+            fig_rank = go.Figure(go.Heatmap(
+                z=counts[shown] / robust['n_samples'] * 100,
+                x=rank_labels,
+                y=df['Region'].values[shown],
+                colorscale='Blues',
+                colorbar=dict(title='%')
+            ))
+            fig_rank.update_layout(title=txt['rank_dist'], xaxis_title=txt['rank'],
+                                   height=max(300, 30 * len(shown)), yaxis=dict(autorange='reversed'))
+            st.plotly_chart(fig_rank, use_container_width=True)
 
 # --- STORY & USE CASES ---
 if 'story_title' in txt:
@@ -3,6 +3,13 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import sys
+import os
+
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.macro_simulation import simulate_rate_transmission
 
 st.set_page_config(page_title="Monetary Policy Analyzer", page_icon="💰", layout="wide")
 
@@ -435,35 +442,13 @@ with tab3:
         if st.button(txt['run_simulation'], type='primary'):
             # Simplified monetary transmission mechanism
             # Rate change affects output gap, which affects inflation and unemployment
-            
-            time = np.arange(periods)
-            
-            # Output gap response (with lag)
-            output_response = np.zeros(periods)
-            for t in range(periods):
-                if t >= lag:
-                    output_response[t] = -0.5 * rate_change * (1 - np.exp(-(t-lag)/3))
-            
-            # Inflation response (follows output gap)
-            inflation_response = np.zeros(periods)
-            base_inflation = 3.0
-            for t in range(periods):
-                if t > 0:
-                    inflation_response[t] = base_inflation + 0.3 * output_response[t] + 0.5 * inflation_response[t-1]
-                else:
-                    inflation_response[t] = base_inflation
-            
-            # Unemployment response (Okun's Law)
-            unemployment_response = np.zeros(periods)
-            base_unemployment = 5.5
-            for t in range(periods):
-                unemployment_response[t] = base_unemployment - 0.5 * output_response[t]
+            response = simulate_rate_transmission(rate_change, periods, lag)
             
             st.session_state['simulation'] = {
-                'time': time,
-                'output': output_response,
-                'inflation': inflation_response,
-                'unemployment': unemployment_response,
+                'time': response['time'],
+                'output': response['output'],
+                'inflation': response['inflation'],
+                'unemployment': response['unemployment'],
                 'rate_change': rate_change
             }
     
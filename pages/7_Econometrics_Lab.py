@@ -3,11 +3,19 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import statsmodels.api as sm
-from statsmodels.stats.diagnostic import het_breuschpagan, acorr_ljungbox
 from statsmodels.stats.stattools import durbin_watson
 from scipy import stats
 import io
+import time
+import sys
+import os
+
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ols import (COV_TYPES, STREAM_COV_TYPES, design_matrix, matrix_key, factorize, fit_ols, robust_cov, coef_table,
+                       breusch_pagan, residual_diagnostics, vif, DATA_DIR, data_file, preview_file, iter_chunks,
+                       streaming_ols, BOOT_METHODS, bootstrap, permutation_test)
 
 st.set_page_config(page_title="Econometrics Lab", page_icon="🧪", layout="wide")
 
@@ -22,9 +30,36 @@ T = {
         'tab1': "📊 Data & Regression",
         'tab2': "🔍 Diagnostics",
         'tab3': "📈 Residual Analysis",
+        'tab4': "🎲 Resampling Inference",
+        'resampling_desc': "Inference without the classical OLS assumptions: bootstrap the coefficients or test each slope by permutation. Replications are solved in batches through the stored factorization and spread across CPU cores.",
+        'resample_method': "Method",
+        'rs_pairs': "Pairs bootstrap (resample rows)",
+        'rs_residual': "Residual bootstrap (homoskedastic errors)",
+        'rs_wild': "Wild bootstrap (heteroskedastic errors)",
+        'rs_permutation': "Permutation test (Freedman-Lane)",
+        'n_reps': "Replications",
+        'run_resampling': "Run Resampling",
+        'resampling_time': "{reps:,} replications on {n:,} rows in {sec:.1f}s ({workers} worker processes)",
+        'boot_se': "Bootstrap SE",
+        'ci_low': "95% CI Lower",
+        'ci_high': "95% CI Upper",
+        'perm_p': "Permutation P-value",
+        'boot_dist': "Bootstrap Distribution",
+        'coef_var': "Coefficient",
         'data_source': "Data Source",
         'upload_data': "Upload CSV/Excel File",
         'generate_data': "Generate Synthetic Data",
+        'stream_data': "Stream Large File (CSV/Parquet)",
+        'stream_file': "Upload a large CSV or Parquet file",
+        'stream_path': "...or a CSV/Parquet file in the server data directory (relative path)",
+        'stream_limit': "Uploads are held in memory and capped at {mb:,} MB (server.maxUploadSize). Larger files can be streamed from disk when the server sets a data directory (ECONOMETRICS_DATA_DIR).",
+        'stream_path_error': "No CSV or Parquet file at this path in the server data directory: {path}",
+        'stream_desc': "Streaming mode reads the file in chunks and accumulates X'X, X'y and the moments for robust SEs, so only the first rows are ever loaded as a table.",
+        'stream_preview': "First {n:,} rows (read-only preview)",
+        'run_stream': "Run Streaming OLS",
+        'stream_done': "Processed {n:,} rows in {chunks:,} chunks ({sec:.1f}s); {dropped:,} rows with missing values skipped",
+        'stream_only': "Residual diagnostics need the rows in memory; use an uploaded or generated dataset.",
+        'n_obs': "Observations",
         'upload_file': "Upload your data file",
         'select_vars': "Select Variables",
         'dependent_var': "Dependent Variable (Y)",
@@ -48,6 +83,13 @@ T = {
         'prob_f': "Prob (F-statistic)",
         'aic': "AIC",
         'bic': "BIC",
+        'cov_type': "Standard Errors",
+        'se_nonrobust': "Classical (homoskedastic)",
+        'se_HC0': "Robust HC0 (White)",
+        'se_HC1': "Robust HC1 (Stata default)",
+        'se_HC2': "Robust HC2",
+        'se_HC3': "Robust HC3 (small samples)",
+        'collinear': "Regressors are perfectly collinear; drop a redundant variable.",
         'diagnostic_tests': "Diagnostic Tests",
         'normality': "Normality Test (Jarque-Bera)",
         'heteroskedasticity': "Heteroskedasticity (Breusch-Pagan)",
@@ -72,9 +114,36 @@ T = {
         'tab1': "📊 Data & Regresi",
         'tab2': "🔍 Diagnostik",
         'tab3': "📈 Analisis Residual",
+        'tab4': "🎲 Inferensi Resampling",
+        'resampling_desc': "Inferensi tanpa asumsi OLS klasik: bootstrap koefisien atau uji setiap slope dengan permutasi. Replikasi diselesaikan per batch melalui faktorisasi yang tersimpan dan dibagi ke seluruh core CPU.",
+        'resample_method': "Metode",
+        'rs_pairs': "Bootstrap pasangan (resample baris)",
+        'rs_residual': "Bootstrap residual (error homoskedastis)",
+        'rs_wild': "Wild bootstrap (error heteroskedastis)",
+        'rs_permutation': "Uji permutasi (Freedman-Lane)",
+        'n_reps': "Jumlah Replikasi",
+        'run_resampling': "Jalankan Resampling",
+        'resampling_time': "{reps:,} replikasi pada {n:,} baris dalam {sec:.1f} detik ({workers} proses worker)",
+        'boot_se': "SE Bootstrap",
+        'ci_low': "Batas Bawah CI 95%",
+        'ci_high': "Batas Atas CI 95%",
+        'perm_p': "P-value Permutasi",
+        'boot_dist': "Distribusi Bootstrap",
+        'coef_var': "Koefisien",
         'data_source': "Sumber Data",
         'upload_data': "Upload File CSV/Excel",
         'generate_data': "Generate Data Sintetis",
+        'stream_data': "Streaming File Besar (CSV/Parquet)",
+        'stream_file': "Upload file CSV atau Parquet berukuran besar",
+        'stream_path': "...atau file CSV/Parquet di direktori data server (path relatif)",
+        'stream_limit': "File yang diunggah disimpan di memori dan dibatasi {mb:,} MB (server.maxUploadSize). File yang lebih besar dapat di-streaming dari disk jika server menetapkan direktori data (ECONOMETRICS_DATA_DIR).",
+        'stream_path_error': "Tidak ada file CSV atau Parquet pada path ini di direktori data server: {path}",
+        'stream_desc': "Mode streaming membaca file per bagian dan mengakumulasi X'X, X'y serta momen untuk SE robust, sehingga hanya baris-baris pertama yang dimuat sebagai tabel.",
+        'stream_preview': "{n:,} baris pertama (pratinjau, tidak dapat diedit)",
+        'run_stream': "Jalankan OLS Streaming",
+        'stream_done': "{n:,} baris diproses dalam {chunks:,} bagian ({sec:.1f} detik); {dropped:,} baris dengan nilai kosong dilewati",
+        'stream_only': "Diagnostik residual membutuhkan data di memori; gunakan dataset yang diunggah atau dibangkitkan.",
+        'n_obs': "Observasi",
         'upload_file': "Upload file data Anda",
         'select_vars': "Pilih Variabel",
         'dependent_var': "Variabel Dependen (Y)",
@@ -98,6 +167,13 @@ T = {
         'prob_f': "Prob (F-statistik)",
         'aic': "AIC",
         'bic': "BIC",
+        'cov_type': "Standard Error",
+        'se_nonrobust': "Klasik (homoskedastis)",
+        'se_HC0': "Robust HC0 (White)",
+        'se_HC1': "Robust HC1 (default Stata)",
+        'se_HC2': "Robust HC2",
+        'se_HC3': "Robust HC3 (sampel kecil)",
+        'collinear': "Regresor berkolinear sempurna; buang variabel yang redundan.",
         'diagnostic_tests': "Tes Diagnostik",
         'normality': "Tes Normalitas (Jarque-Bera)",
         'heteroskedasticity': "Heteroskedastisitas (Breusch-Pagan)",
@@ -126,9 +202,22 @@ st.markdown(txt['subtitle'])
 # Sidebar for data source
 with st.sidebar:
     st.markdown(f"### {txt['data_source']}")
-    data_source = st.radio("", [txt['upload_data'], txt['generate_data']])
+    data_source = st.radio("", [txt['upload_data'], txt['generate_data'], txt['stream_data']])
+    streaming = data_source == txt['stream_data']
     
-    if data_source == txt['upload_data']:
+    if streaming:
+        stream_file = st.file_uploader(txt['stream_file'], type=['csv', 'parquet'], key='stream_file')
+        st.caption(txt['stream_limit'].format(mb=st.get_option('server.maxUploadSize')))
+        # Server-side files are streamed from disk (no upload limit), but only from DATA_DIR
+        stream_path = st.text_input(txt['stream_path'], key='stream_path').strip() if DATA_DIR else ''
+        server_file = data_file(stream_path) if stream_path else None
+        if server_file is not None:
+            stream_file = server_file
+        elif stream_path:
+            st.error(txt['stream_path_error'].format(path=stream_path))
+        st.caption(txt['stream_desc'])
+    
+    elif data_source == txt['upload_data']:
         uploaded_file = st.file_uploader(txt['upload_file'], type=['csv', 'xlsx'])
         
         if uploaded_file is not None:
@@ -189,11 +278,69 @@ with st.sidebar:
             st.rerun()
 
 # TABS
-tab1, tab2, tab3 = st.tabs([txt['tab1'], txt['tab2'], txt['tab3']])
+tab1, tab2, tab3, tab4 = st.tabs([txt['tab1'], txt['tab2'], txt['tab3'], txt['tab4']])
 
 # ========== TAB 1: DATA & REGRESSION ==========
 with tab1:
-    if 'data' in st.session_state:
+    if streaming:
+        if stream_file is not None:
+            preview = preview_file(stream_file)
+            st.markdown(f"### {txt['data_preview']}")
+            st.caption(txt['stream_preview'].format(n=len(preview)))
+            st.dataframe(preview.head(100), use_container_width=True)
+            
+            st.markdown(f"### {txt['select_vars']}")
+            col1, col2 = st.columns(2)
+            with col1:
+                y_var = st.selectbox(txt['dependent_var'], preview.columns, key='stream_y')
+            with col2:
+                x_vars = st.multiselect(txt['independent_vars'], [col for col in preview.columns if col != y_var],
+                                        key='stream_x')
+            
+            if st.button(txt['run_stream'], type='primary') and len(x_vars) > 0:
+                start = time.perf_counter()
+                try:
+                    fit = streaming_ols(iter_chunks(stream_file, [y_var] + x_vars), y_var, x_vars)
+                    fit['seconds'] = time.perf_counter() - start
+                    st.session_state['stream_fit'] = {'fit': fit, 'names': ['const'] + x_vars}
+                except ValueError as e:
+                    st.error(str(e))
+            
+            if 'stream_fit' in st.session_state:
+                model, names = st.session_state['stream_fit']['fit'], st.session_state['stream_fit']['names']
+                st.markdown(f"### {txt['regression_results']}")
+                st.caption(txt['stream_done'].format(n=model['nobs'], chunks=model['n_chunks'],
+                                                     sec=model['seconds'], dropped=model['n_dropped']))
+                
+                col1, col2 = st.columns([1, 1])
+                with col1:
+                    st.markdown(f"#### {txt['coefficients']}")
+                    cov_type = st.radio(txt['cov_type'], STREAM_COV_TYPES, index=2,
+                                        format_func=lambda x: txt[f'se_{x}'], horizontal=True, key='stream_cov')
+                    bse, tvalues, pvalues = coef_table(model['params'], model['covs'][cov_type], model['df_resid'])
+                    st.dataframe(pd.DataFrame({
+                        'Variable': names,
+                        'Coefficient': model['params'],
+                        'Std Error': bse,
+                        't-statistic': tvalues,
+                        'P-value': pvalues
+                    }), use_container_width=True, hide_index=True)
+                
+                with col2:
+                    st.markdown(f"#### {txt['model_fit']}")
+                    m1, m2 = st.columns(2)
+                    m1.metric(txt['r_squared'], f"{model['rsquared']:.4f}")
+                    m2.metric(txt['adj_r_squared'], f"{model['rsquared_adj']:.4f}")
+                    m3, m4 = st.columns(2)
+                    m3.metric(txt['f_statistic'], f"{model['fvalue']:.2f}")
+                    m4.metric(txt['prob_f'], f"{model['f_pvalue']:.4f}")
+                    m5, m6 = st.columns(2)
+                    m5.metric(txt['n_obs'], f"{model['nobs']:,}")
+                    m6.metric(txt['aic'], f"{model['aic']:.2f}")
+        else:
+            st.info(txt['stream_desc'])
+    
+    elif 'data' in st.session_state:
         df = st.session_state['data']
         
         st.markdown(f"### {txt['data_preview']}")
@@ -210,27 +357,29 @@ with tab1:
                                     [col for col in edited_df.columns if col != y_var])
         
         if st.button(txt['run_regression'], type='primary') and len(x_vars) > 0:
-            # Prepare data
-            Y = edited_df[y_var].dropna()
-            X = edited_df[x_vars].dropna()
-            
-            # Align indices
-            common_idx = Y.index.intersection(X.index)
-            Y = Y.loc[common_idx]
-            X = X.loc[common_idx]
+            # Prepare data: constant plus regressors, rows with any missing value dropped
+            Y, X, names, index = design_matrix(edited_df, y_var, x_vars)
             
-            # Add constant
-            X_const = sm.add_constant(X)
-            
-            # Fit model
-            model = sm.OLS(Y, X_const).fit()
-            
-            # Store in session state
-            st.session_state['model'] = model
-            st.session_state['Y'] = Y
-            st.session_state['X'] = X
-            st.session_state['y_var'] = y_var
-            st.session_state['x_vars'] = x_vars
+            # Factorize X once; the same design (e.g. after editing only Y) reuses the cached QR
+            factor = st.session_state.get('ols_factor')
+            try:
+                if factor is None or factor['key'] != matrix_key(X):
+                    factor = factorize(X)
+                st.session_state['ols_factor'] = factor
+                
+                # Store in session state
+                st.session_state['ols_fit'] = fit_ols(Y, X, factor)
+                st.session_state['ols_data'] = {'Y': Y, 'X': X, 'names': names, 'index': index}
+                st.session_state['y_var'] = y_var
+                st.session_state['x_vars'] = x_vars
+            except ValueError:
+                st.error(txt['collinear'])
+        
+        if 'ols_fit' in st.session_state:
+            model = st.session_state['ols_fit']
+            factor = st.session_state['ols_factor']
+            data = st.session_state['ols_data']
+            y_var, x_vars = st.session_state['y_var'], st.session_state['x_vars']
             
             # Display results
             st.markdown(f"### {txt['regression_results']}")
@@ -239,12 +388,16 @@ with tab1:
             
             with col1:
                 st.markdown(f"#### {txt['coefficients']}")
+                
+                # Switching the covariance estimator reuses the stored fit and factorization
+                cov_type = st.radio(txt['cov_type'], COV_TYPES, format_func=lambda x: txt[f'se_{x}'], horizontal=True)
+                bse, tvalues, pvalues = coef_table(model['params'], robust_cov(model, factor, cov_type), model['df_resid'])
                 coef_df = pd.DataFrame({
-                    'Variable': model.params.index,
-                    'Coefficient': model.params.values,
-                    'Std Error': model.bse.values,
-                    't-statistic': model.tvalues.values,
-                    'P-value': model.pvalues.values
+                    'Variable': data['names'],
+                    'Coefficient': model['params'],
+                    'Std Error': bse,
+                    't-statistic': tvalues,
+                    'P-value': pvalues
                 })
                 st.dataframe(coef_df, use_container_width=True, hide_index=True)
                 
@@ -255,42 +408,55 @@ with tab1:
                 st.markdown(f"#### {txt['model_fit']}")
                 
                 m1, m2 = st.columns(2)
-                m1.metric(txt['r_squared'], f"{model.rsquared:.4f}")
-                m2.metric(txt['adj_r_squared'], f"{model.rsquared_adj:.4f}")
+                m1.metric(txt['r_squared'], f"{model['rsquared']:.4f}")
+                m2.metric(txt['adj_r_squared'], f"{model['rsquared_adj']:.4f}")
                 
                 m3, m4 = st.columns(2)
-                m3.metric(txt['f_statistic'], f"{model.fvalue:.2f}")
-                m4.metric(txt['prob_f'], f"{model.f_pvalue:.4f}")
+                m3.metric(txt['f_statistic'], f"{model['fvalue']:.2f}")
+                m4.metric(txt['prob_f'], f"{model['f_pvalue']:.4f}")
                 
                 m5, m6 = st.columns(2)
-                m5.metric(txt['aic'], f"{model.aic:.2f}")
-                m6.metric(txt['bic'], f"{model.bic:.2f}")
+                m5.metric(txt['aic'], f"{model['aic']:.2f}")
+                m6.metric(txt['bic'], f"{model['bic']:.2f}")
             
             # Full summary
             with st.expander("📋 Full Regression Output"):
-                st.text(model.summary())
+                stars = np.select([pvalues < 0.01, pvalues < 0.05, pvalues < 0.1], ['***', '**', '*'], '')
+                diag = residual_diagnostics(model['resid'], factor)
+                st.text(
+                    f"Dep. Variable: {y_var}    Observations: {model['nobs']}    Df Model: {model['df_model']}    "
+                    f"Df Residuals: {model['df_resid']}    Covariance: {cov_type}\n"
+                    f"R-squared: {model['rsquared']:.4f}    Adj. R-squared: {model['rsquared_adj']:.4f}    "
+                    f"F-statistic: {model['fvalue']:.4f} (p={model['f_pvalue']:.4g})\n"
+                    f"Log-Likelihood: {model['llf']:.4f}    AIC: {model['aic']:.4f}    BIC: {model['bic']:.4f}\n\n"
+                    + coef_df.assign(**{' ': stars}).to_string(index=False, float_format=lambda v: f"{v:.4f}") + "\n\n"
+                    f"Omnibus: {diag['omnibus']:.4f}    Prob(Omnibus): {diag['omnibus_pvalue']:.4f}    "
+                    f"Skew: {diag['skew']:.4f}    Kurtosis: {diag['kurtosis']:.4f}\n"
+                    f"Durbin-Watson: {diag['durbin_watson']:.4f}    Jarque-Bera (JB): {diag['jarque_bera']:.4f}    "
+                    f"Prob(JB): {diag['jb_pvalue']:.4g}    Cond. No.: {diag['condition_number']:.3g}"
+                )
             
             # Scatter plot with regression line (for single X)
             if len(x_vars) == 1:
                 st.markdown("### Visualization")
                 
                 fig = go.Figure()
+                x_values = data['X'][:, 1]
                 
                 # Scatter
                 fig.add_trace(go.Scatter(
-                    x=X[x_vars[0]],
-                    y=Y,
+                    x=x_values,
+                    y=data['Y'],
                     mode='markers',
                     name='Actual',
                     marker=dict(size=8, opacity=0.6)
                 ))
                 
                 # Regression line
-                y_pred = model.predict(X_const)
-                sorted_idx = X[x_vars[0]].argsort()
+                sorted_idx = x_values.argsort()
                 fig.add_trace(go.Scatter(
-                    x=X[x_vars[0]].iloc[sorted_idx],
-                    y=y_pred.iloc[sorted_idx],
+                    x=x_values[sorted_idx],
+                    y=model['fitted'][sorted_idx],
                     mode='lines',
                     name='Fitted',
                     line=dict(color='red', width=3)
@@ -309,14 +475,17 @@ with tab1:
 
 # ========== TAB 2: DIAGNOSTICS ==========
 with tab2:
-    if 'model' in st.session_state:
-        model = st.session_state['model']
-        Y = st.session_state['Y']
-        X = st.session_state['X']
+    if streaming:
+        st.info(txt['stream_only'])
+    elif 'ols_fit' in st.session_state:
+        model = st.session_state['ols_fit']
+        factor = st.session_state['ols_factor']
+        X = st.session_state['ols_data']['X']
+        x_vars = st.session_state['x_vars']
         
         st.markdown(f"### {txt['diagnostic_tests']}")
         
-        residuals = model.resid
+        residuals = model['resid']
         
         col1, col2 = st.columns(2)
         
@@ -335,8 +504,8 @@ with tab2:
             # Heteroskedasticity test
             st.markdown(f"#### {txt['heteroskedasticity']}")
             try:
-                X_const = sm.add_constant(X)
-                bp_stat, bp_pvalue, _, _ = het_breuschpagan(residuals, X_const)
+                # Auxiliary regression of squared residuals projected with the cached QR
+                bp_stat, bp_pvalue, _, _ = breusch_pagan(residuals, factor)
                 
                 if bp_pvalue > 0.05:
                     st.success(f"✅ Homoskedastic (p={bp_pvalue:.4f})")
@@ -361,12 +530,11 @@ with tab2:
             
             # Multicollinearity (VIF)
             st.markdown(f"#### {txt['multicollinearity']}")
-            if len(X.columns) > 1:
-                from statsmodels.stats.outliers_influence import variance_inflation_factor
-                
+            if len(x_vars) > 1:
+                # Every VIF at once from the inverse correlation matrix of the regressors
                 vif_data = pd.DataFrame()
-                vif_data["Variable"] = X.columns
-                vif_data["VIF"] = [variance_inflation_factor(X.values, i) for i in range(len(X.columns))]
+                vif_data["Variable"] = x_vars
+                vif_data["VIF"] = vif(X[:, 1:])
                 
                 st.dataframe(vif_data, use_container_width=True, hide_index=True)
                 
@@ -407,14 +575,16 @@ with tab2:
 
 # ========== TAB 3: RESIDUAL ANALYSIS ==========
 with tab3:
-    if 'model' in st.session_state:
-        model = st.session_state['model']
-        Y = st.session_state['Y']
+    if streaming:
+        st.info(txt['stream_only'])
+    elif 'ols_fit' in st.session_state:
+        model = st.session_state['ols_fit']
+        index = st.session_state['ols_data']['index']
         
         st.markdown(f"### {txt['residual_plots']}")
         
-        residuals = model.resid
-        fitted = model.fittedvalues
+        residuals = pd.Series(model['resid'], index=index)
+        fitted = pd.Series(model['fitted'], index=index)
         
         # Create subplots
         fig = make_subplots(
@@ -465,6 +635,64 @@ with tab3:
     else:
         st.info("Run regression first to see residual analysis.")
 
+# ========== TAB 4: RESAMPLING INFERENCE ==========
+with tab4:
+    if streaming:
+        st.info(txt['stream_only'])
+    elif 'ols_fit' in st.session_state:
+        model = st.session_state['ols_fit']
+        factor = st.session_state['ols_factor']
+        data = st.session_state['ols_data']
+        
+        st.caption(txt['resampling_desc'])
+        rc1, rc2 = st.columns(2)
+        method = rc1.selectbox(txt['resample_method'], BOOT_METHODS + ['permutation'], format_func=lambda x: txt[f'rs_{x}'])
+        n_reps = rc2.select_slider(txt['n_reps'], [500, 1000, 2000, 5000, 10000], 2000)
+        # Identifies the regression: the same design with a different dependent variable is a new fit
+        fit_key = f"{factor['key']}|{matrix_key(data['Y'])}"
+        
+        if st.button(txt['run_resampling'], type='primary'):
+            start = time.perf_counter()
+            if method == 'permutation':
+                result = permutation_test(data['Y'], data['X'], factor, n_reps)
+            else:
+                result = bootstrap(data['Y'], data['X'], factor, method, n_reps)
+            result.update({'method': method, 'n_reps': n_reps, 'key': fit_key,
+                           'seconds': time.perf_counter() - start})
+            st.session_state['ols_resampling'] = result
+        
+        result = st.session_state.get('ols_resampling')
+        # Results of an earlier regression are not shown against the current one
+        if result is not None and result['key'] == fit_key:
+            st.caption(txt['resampling_time'].format(reps=result['n_reps'], n=model['nobs'], sec=result['seconds'],
+                                                     workers=result['n_workers']))
+            resample_df = pd.DataFrame({
+                'Variable': data['names'],
+                'Coefficient': model['params'],
+                'Std Error': model['bse'],
+                'P-value': model['pvalues']
+            })
+            if result['method'] == 'permutation':
+                resample_df[txt['perm_p']] = result['pvalues']
+            else:
+                resample_df[txt['boot_se']] = result['se']
+                resample_df[txt['ci_low']] = result['ci_low']
+                resample_df[txt['ci_high']] = result['ci_high']
+            st.dataframe(resample_df, use_container_width=True, hide_index=True)
+            
+            if result['method'] != 'permutation':
+                j = st.selectbox(txt['coef_var'], range(len(data['names'])), format_func=lambda i: data['names'][i],
+                                 index=min(1, len(data['names']) - 1))
+                fig = go.Figure(go.Histogram(x=result['draws'][:, j], nbinsx=60, name=txt['boot_dist']))
+                fig.add_vline(x=model['params'][j], line_color='red', line_dash='dash')
+                for bound in (result['ci_low'][j], result['ci_high'][j]):
+                    fig.add_vline(x=bound, line_color='gray', line_dash='dot')
+                fig.update_layout(title=f"{txt['boot_dist']}: {data['names'][j]}", xaxis_title=txt['coef_var'],
+                                  height=400, showlegend=False)
+                st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Run regression first to see resampling inference.")
+
 # --- STORY & USE CASES ---
 if 'story_title' in txt:
     st.divider()
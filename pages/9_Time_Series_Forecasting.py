@@ -2,13 +2,20 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from statsmodels.tsa.holtwinters import ExponentialSmoothing
-from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.graphics.tsaplots import plot_acf, plot_pacf
 from statsmodels.tsa.stattools import adfuller
 import warnings
+import sys
+import os
+import time
 warnings.filterwarnings('ignore')
 
+# Add parent dir to path to find utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.forecasting import (arima_grid_search, stepwise_arima, fit_holt_winters, fit_arima, update_arima,
+                               batch_forecast, backtest, cached_paths, fan_bands)
+
 st.set_page_config(page_title="Forecasting", page_icon="📈", layout="wide")
 
 if 'language' not in st.session_state:
@@ -21,6 +28,7 @@ T = {
         'subtitle': "Predict future economic trends using **Holt-Winters** and **ARIMA** models.",
         'tab1': "📊 Holt-Winters",
         'tab2': "🤖 ARIMA Model",
+        'tab3': "🔁 Backtest",
         'setup': "⚙️ Data & Model Setup",
         'dataset': "Select Indicator:",
         'cpi': "Inflation (CPI)",
@@ -60,18 +68,62 @@ T = {
         'ma_order': "MA Order (q)",
         'fit_arima': "🎯 Fit ARIMA Model",
         'optimal_model': "Optimal Model",
+        'candidates': "Candidate Models (ranked by AIC)",
+        'search_method': "Search Method",
+        'stepwise': "Stepwise (fast, p, q ≤ 5)",
+        'full_grid': "Full grid (p ≤ 2, d ≤ 1, q ≤ 2)",
+        'search_info': "d = {d} from ADF tests; {n} models fitted",
+        'incremental': "Incremental update (filter new rows through the estimated model)",
+        'fan_levels': "Fan Chart Bands (%)",
+        'band': "{level}% band",
+        'reestimate': "♻️ Re-estimate Parameters",
+        'incremental_info': "{n} new observation(s) filtered through the model estimated on the first {m}; parameters not re-estimated.",
         'stationarity': "Stationarity Test (ADF)",
         'stationary': "✅ Data is STATIONARY (p-value < 0.05)",
         'non_stationary': "⚠️ Data is NON-STATIONARY (p-value ≥ 0.05) - Differencing recommended",
         'diagnostics': "📊 Diagnostic Plots",
         'acf_plot': "ACF (Autocorrelation Function)",
-        'pacf_plot': "PACF (Partial Autocorrelation Function)"
+        'pacf_plot': "PACF (Partial Autocorrelation Function)",
+        # Batch forecasting
+        'batch_title': "📦 Batch Forecasting (Many Series)",
+        'batch_desc': "Forecast a whole panel of series at once, e.g. regional CPI. Upload a long-format CSV/Parquet with columns `series_id`, `date`, `value`, or generate a demo panel.",
+        'upload_panel': "Upload Panel (CSV / Parquet)",
+        'demo_series': "Demo Panel: Number of Regions",
+        'gen_panel': "🔄 Generate Demo Panel",
+        'batch_method': "Model",
+        'auto_arima': "ARIMA (auto, stepwise)",
+        'run_batch': "🚀 Forecast All Series",
+        'panel_info': "{n} series, {rows} observations",
+        'missing_columns': "The panel needs the columns series_id, date and value.",
+        'non_numeric': "{n} series with non-numeric values were skipped: {ids}",
+        'n_series': "Series",
+        'batch_seconds': "Time (s)",
+        'throughput': "Throughput (series/s)",
+        'failed_series': "Failed",
+        'select_series': "Show Series",
+        'interval': "95% Interval",
+        'download': "📥 Download Forecasts (CSV)",
+        # Backtest
+        'backtest_desc': "Rolling-origin evaluation: refit at every origin and score the next forecasts out of sample (Holt-Winters uses the settings of the first tab).",
+        'backtest_model': "Model to Evaluate",
+        'initial_window': "Initial Training Window",
+        'window_type': "Window",
+        'expanding': "Expanding",
+        'rolling': "Rolling (fixed length)",
+        'origin_step': "Step Between Origins",
+        'run_backtest': "🔁 Run Backtest",
+        'backtest_summary': "Out-of-Sample Error by Horizon",
+        'folds_info': "{folds} folds evaluated in {seconds:.2f} s",
+        'in_sample': "In-sample RMSE",
+        'out_sample': "Out-of-sample RMSE (1 step)",
+        'too_short': "Series too short for this window and horizon."
     },
     'ID': {
         'title': "📈 Lab Peramalan Ekonomi",
         'subtitle': "Prediksi tren ekonomi masa depan menggunakan **Holt-Winters** dan **ARIMA**.",
         'tab1': "📊 Holt-Winters",
         'tab2': "🤖 Model ARIMA",
+        'tab3': "🔁 Uji Mundur",
         'setup': "⚙️ Pengaturan Data & Model",
         'dataset': "Pilih Indikator:",
         'cpi': "Inflasi (IHK)",
@@ -111,17 +163,77 @@ T = {
         'ma_order': "Orde MA (q)",
         'fit_arima': "🎯 Fit Model ARIMA",
         'optimal_model': "Model Optimal",
+        'candidates': "Kandidat Model (diurutkan menurut AIC)",
+        'search_method': "Metode Pencarian",
+        'stepwise': "Bertahap (cepat, p, q ≤ 5)",
+        'full_grid': "Grid penuh (p ≤ 2, d ≤ 1, q ≤ 2)",
+        'search_info': "d = {d} dari uji ADF; {n} model diestimasi",
+        'incremental': "Pembaruan inkremental (saring baris baru melalui model yang sudah diestimasi)",
+        'fan_levels': "Pita Fan Chart (%)",
+        'band': "Pita {level}%",
+        'reestimate': "♻️ Estimasi Ulang Parameter",
+        'incremental_info': "{n} observasi baru disaring melalui model yang diestimasi pada {m} observasi pertama; parameter tidak diestimasi ulang.",
         'stationarity': "Tes Stasioneritas (ADF)",
         'stationary': "✅ Data STASIONER (p-value < 0.05)",
         'non_stationary': "⚠️ Data TIDAK STASIONER (p-value ≥ 0.05) - Diferensiasi direkomendasikan",
         'diagnostics': "📊 Plot Diagnostik",
         'acf_plot': "ACF (Fungsi Autokorelasi)",
-        'pacf_plot': "PACF (Fungsi Autokorelasi Parsial)"
+        'pacf_plot': "PACF (Fungsi Autokorelasi Parsial)",
+        # Batch forecasting
+        'batch_title': "📦 Peramalan Massal (Banyak Deret)",
+        'batch_desc': "Ramalkan seluruh panel deret sekaligus, misalnya IHK regional. Unggah CSV/Parquet format panjang dengan kolom `series_id`, `date`, `value`, atau hasilkan panel demo.",
+        'upload_panel': "Unggah Panel (CSV / Parquet)",
+        'demo_series': "Panel Demo: Jumlah Wilayah",
+        'gen_panel': "🔄 Hasilkan Panel Demo",
+        'batch_method': "Model",
+        'auto_arima': "ARIMA (otomatis, bertahap)",
+        'run_batch': "🚀 Ramalkan Semua Deret",
+        'panel_info': "{n} deret, {rows} observasi",
+        'missing_columns': "Panel harus memiliki kolom series_id, date, dan value.",
+        'non_numeric': "{n} deret dengan nilai non-numerik dilewati: {ids}",
+        'n_series': "Deret",
+        'batch_seconds': "Waktu (detik)",
+        'throughput': "Throughput (deret/detik)",
+        'failed_series': "Gagal",
+        'select_series': "Tampilkan Deret",
+        'interval': "Interval 95%",
+        'download': "📥 Unduh Hasil Ramalan (CSV)",
+        # Backtest
+        'backtest_desc': "Evaluasi rolling-origin: model diestimasi ulang di setiap titik asal dan ramalan berikutnya dinilai di luar sampel (Holt-Winters memakai pengaturan tab pertama).",
+        'backtest_model': "Model yang Dievaluasi",
+        'initial_window': "Jendela Pelatihan Awal",
+        'window_type': "Jendela",
+        'expanding': "Meluas (expanding)",
+        'rolling': "Bergulir (panjang tetap)",
+        'origin_step': "Jarak Antar Titik Asal",
+        'run_backtest': "🔁 Jalankan Uji Mundur",
+        'backtest_summary': "Kesalahan Luar Sampel per Horizon",
+        'folds_info': "{folds} lipatan dievaluasi dalam {seconds:.2f} detik",
+        'in_sample': "RMSE dalam sampel",
+        'out_sample': "RMSE luar sampel (1 langkah)",
+        'too_short': "Deret terlalu pendek untuk jendela dan horizon ini."
     }
 }
 
 txt = T[lang]
 
+def add_fan(fig, dates, paths, levels, rgb):
+    """Shade percentile bands of simulated paths, widest (lightest) first"""
+    if not levels:
+        return
+    _, bands = fan_bands(paths, levels)
+    for i, level in enumerate(sorted(levels, reverse=True)):
+        lower, upper = bands[level]
+        fig.add_trace(go.Scatter(
+            x=list(dates) + list(dates[::-1]),
+            y=list(upper) + list(lower[::-1]),
+            fill='toself',
+            fillcolor=f'rgba({rgb},{0.12 + 0.12 * i})',
+            line=dict(width=0),
+            name=txt['band'].format(level=level),
+            hoverinfo='skip'
+        ))
+
 st.title(txt['title'])
 st.markdown(txt['subtitle'])
 
@@ -194,7 +306,7 @@ with col1:
 # --- TABS ---
 with col2:
     if df_model is not None and not df_model.empty:
-        tab1, tab2 = st.tabs([txt['tab1'], txt['tab2']])
+        tab1, tab2, tab3 = st.tabs([txt['tab1'], txt['tab2'], txt['tab3']])
         
         # ========== TAB 1: HOLT-WINTERS ==========
         with tab1:
@@ -205,17 +317,13 @@ with col2:
             
             trend_type = st.selectbox(txt['trend'], ["add", "mul", None], format_func=lambda x: txt['additive'] if x == 'add' else (txt['multiplicative'] if x == 'mul' else txt['none']), key='hw_trend')
             seasonal_type = st.selectbox(txt['seasonal'], ["add", "mul", None], format_func=lambda x: txt['additive'] if x == 'add' else (txt['multiplicative'] if x == 'mul' else txt['none']), key='hw_seasonal')
+            hw_levels = st.multiselect(txt['fan_levels'], [50, 80, 90, 95, 99], default=[50, 80, 95], key='hw_fan')
             
             df = df_model
             
             try:
-                model = ExponentialSmoothing(
-                    df['Value'],
-                    trend=trend_type,
-                    seasonal=seasonal_type,
-                    seasonal_periods=seasonal_periods,
-                    initialization_method="estimated"
-                ).fit()
+                # Cached on the series content and spec; changing the horizon only re-forecasts
+                model = fit_holt_winters(df['Value'], trend_type, seasonal_type, seasonal_periods)
                 
                 forecast_values = model.forecast(horizon_hw)
                 
@@ -232,6 +340,10 @@ with col2:
                 # Plotly chart
                 fig = go.Figure()
                 
+                # Fan chart from cached simulated paths (new bands or horizons do not re-simulate)
+                paths = cached_paths('holt_winters', df['Value'], (trend_type, seasonal_type, seasonal_periods))
+                add_fan(fig, future_dates, paths[:horizon_hw], hw_levels, '255,165,0')
+                
                 fig.add_trace(go.Scatter(
                     x=df['Date'],
                     y=df['Value'],
@@ -275,7 +387,10 @@ with col2:
             
             auto_select = st.checkbox(txt['auto_select'], value=True)
             
-            if not auto_select:
+            if auto_select:
+                search_method = st.radio(txt['search_method'], ['stepwise', 'full_grid'],
+                                         format_func=lambda x: txt[x], horizontal=True)
+            else:
                 st.markdown(f"**{txt['manual_params']}**")
                 col_p, col_d, col_q = st.columns(3)
                 with col_p:
@@ -286,8 +401,14 @@ with col2:
                     q = st.number_input(txt['ma_order'], 0, 5, 1)
             
             horizon_arima = st.slider(txt['horizon'], 1, 24, 12, key='arima_horizon')
+            incremental = st.checkbox(txt['incremental'], value=True)
+            arima_levels = st.multiselect(txt['fan_levels'], [50, 80, 90, 95, 99], default=[50, 80, 95], key='arima_fan')
+            
+            col_fit, col_reest = st.columns(2)
+            fit_clicked = col_fit.button(txt['fit_arima'], type='primary')
+            reestimate = col_reest.button(txt['reestimate'])
             
-            if st.button(txt['fit_arima'], type='primary'):
+            if fit_clicked or reestimate:
                 df = df_model
                 
                 try:
@@ -305,30 +426,49 @@ with col2:
                     
                     st.markdown("---")
                     
-                    # Auto-select parameters using grid search
-                    if auto_select:
+                    # Rows appended since the last fit are filtered through the estimated
+                    # model (for auto-select, with the order the same search selected last)
+                    model_arima, n_new = None, 0
+                    if incremental and not reestimate:
+                        if not auto_select:
+                            order = (p, d, q)
+                        elif st.session_state.get('arima_order_auto') == search_method:
+                            order = st.session_state.get('arima_order')
+                        else:
+                            order = None
+                        if order is not None:
+                            model_arima, n_new = update_arima(df['Value'], order)
+                    
+                    if model_arima is not None:
+                        p, d, q = model_arima.model.order
+                        if n_new > 0:
+                            st.info(txt['incremental_info'].format(n=n_new, m=model_arima.nobs - n_new))
+                    
+                    # Auto-select parameters (stepwise or parallel grid search)
+                    elif auto_select:
                         st.info("🔍 Searching for optimal ARIMA parameters...")
                         
-                        best_aic = np.inf
-                        best_order = None
+                        if search_method == 'stepwise':
+                            ranking, best, d = stepwise_arima(df['Value'])
+                            st.caption(txt['search_info'].format(d=d, n=len(ranking)))
+                        else:
+                            ranking, best = arima_grid_search(df['Value'])
                         
-                        # Grid search
-                        for p_test in range(0, 3):
-                            for d_test in range(0, 2):
-                                for q_test in range(0, 3):
-                                    try:
-                                        temp_model = ARIMA(df['Value'], order=(p_test, d_test, q_test)).fit()
-                                        if temp_model.aic < best_aic:
-                                            best_aic = temp_model.aic
-                                            best_order = (p_test, d_test, q_test)
-                                    except:
-                                        continue
-                        
-                        p, d, q = best_order
+                        # The winning fit is reused as the final model
+                        p, d, q = best['order']
+                        model_arima = best['result']
+                        if reestimate:
+                            model_arima = fit_arima(df['Value'], (p, d, q), refit=True)
                         st.success(f"{txt['optimal_model']}: ARIMA({p},{d},{q})")
+                        
+                        with st.expander(txt['candidates']):
+                            st.dataframe(ranking, use_container_width=True, hide_index=True)
+                    else:
+                        model_arima = fit_arima(df['Value'], (p, d, q), refit=reestimate)
                     
-                    # Fit final model
-                    model_arima = ARIMA(df['Value'], order=(p, d, q)).fit()
+                    st.session_state['arima_order'] = (p, d, q)
+                    # Search that chose the order (None for a manual order), so auto-select never reuses a manual one
+                    st.session_state['arima_order_auto'] = search_method if auto_select else None
                     
                     # Forecast
                     forecast_arima = model_arima.forecast(steps=horizon_arima)
@@ -349,6 +489,9 @@ with col2:
                     
                     fig = go.Figure()
                     
+                    paths = cached_paths('arima', df['Value'], (p, d, q))
+                    add_fan(fig, future_dates, paths[:horizon_arima], arima_levels, '255,0,0')
+                    
                     fig.add_trace(go.Scatter(
                         x=df['Date'],
                         y=df['Value'],
@@ -411,5 +554,152 @@ with col2:
                 except Exception as e:
                     st.error(f"Error fitting ARIMA model: {e}")
                     st.warning("Try adjusting parameters or generating more data.")
+        
+        # ========== TAB 3: ROLLING-ORIGIN BACKTEST ==========
+        with tab3:
+            st.markdown(txt['backtest_desc'])
+            
+            bt_model = st.selectbox(txt['backtest_model'], ['holt_winters', 'arima'],
+                                    format_func=lambda x: txt['tab1'] if x == 'holt_winters' else txt['tab2'])
+            if bt_model == 'arima':
+                col_p, col_d, col_q = st.columns(3)
+                bt_order = (col_p.number_input(txt['ar_order'], 0, 5, 1, key='bt_p'),
+                            col_d.number_input(txt['diff_order'], 0, 2, 1, key='bt_d'),
+                            col_q.number_input(txt['ma_order'], 0, 5, 1, key='bt_q'))
+            
+            n_obs = len(df_model)
+            bt_horizon = st.slider(txt['horizon'], 1, 12, 6, key='bt_horizon')
+            # The initial window is at least 12 observations and leaves a full horizon of actuals
+            if n_obs < 12 + bt_horizon + 1:
+                st.warning(txt['too_short'])
+            else:
+                max_initial = n_obs - bt_horizon
+                bt_initial = st.slider(txt['initial_window'], 12, max_initial,
+                                       min(max(12, min(36, n_obs // 2)), max_initial))
+                bt_step = st.slider(txt['origin_step'], 1, 12, 1)
+                bt_window = st.radio(txt['window_type'], ['expanding', 'rolling'], format_func=lambda x: txt[x], horizontal=True)
+            
+                if st.button(txt['run_backtest'], type='primary'):
+                    spec = tuple(bt_order) if bt_model == 'arima' else (trend_type, seasonal_type, seasonal_periods)
+                    start = time.perf_counter()
+                    try:
+                        errors, summary = backtest(df_model['Value'], bt_model, spec, initial=bt_initial,
+                                                   horizon=bt_horizon, step=bt_step,
+                                                   window=bt_initial if bt_window == 'rolling' else None)
+                    
+                        st.markdown(f"### {txt['backtest_summary']}")
+                        st.caption(txt['folds_info'].format(folds=errors['origin'].nunique(),
+                                                            seconds=time.perf_counter() - start))
+                    
+                        fig = go.Figure()
+                        fig.add_trace(go.Bar(x=summary.index, y=summary['MAE'], name='MAE'))
+                        fig.add_trace(go.Scatter(x=summary.index, y=summary['RMSE'], mode='lines+markers', name='RMSE'))
+                        fig.update_layout(xaxis_title=txt['horizon'], yaxis_title=txt['value'], height=350)
+                        st.plotly_chart(fig, use_container_width=True)
+                    
+                        st.dataframe(summary.style.format('{:.4f}'), use_container_width=True)
+                    
+                        # In-sample fit vs the honest one-step-ahead error
+                        full = fit_arima(df_model['Value'], spec) if bt_model == 'arima' else fit_holt_winters(df_model['Value'], *spec)
+                        # (skipping the diffuse burn-in of differenced ARIMA models)
+                        in_sample = (df_model['Value'] - full.fittedvalues).iloc[getattr(full, 'loglikelihood_burn', 0):]
+                        m1, m2 = st.columns(2)
+                        m1.metric(txt['in_sample'], f"{np.sqrt(np.mean(in_sample**2)):.4f}")
+                        m2.metric(txt['out_sample'], f"{summary['RMSE'].iloc[0]:.4f}")
+                    except Exception as e:
+                        st.error(f"Error fitting model: {e}")
     else:
         st.info("Please generate data first using the controls on the left.")
+
+# ========== BATCH FORECASTING ==========
+st.markdown("---")
+st.markdown(f"## {txt['batch_title']}")
+st.markdown(txt['batch_desc'])
+
+bcol1, bcol2 = st.columns([1, 2])
+
+with bcol1:
+    uploaded = st.file_uploader(txt['upload_panel'], type=['csv', 'parquet'])
+    if uploaded is not None:
+        try:
+            upload_df = pd.read_parquet(uploaded) if uploaded.name.endswith('.parquet') else pd.read_csv(uploaded)
+            if {'series_id', 'date', 'value'} <= set(upload_df.columns):
+                upload_df['date'] = pd.to_datetime(upload_df['date'])
+                # Series with cells that are not numbers are reported and left out of the panel
+                values = pd.to_numeric(upload_df['value'], errors='coerce')
+                bad = upload_df.loc[values.isna() & upload_df['value'].notna(), 'series_id'].unique()
+                if len(bad) > 0:
+                    st.warning(txt['non_numeric'].format(n=len(bad), ids=', '.join(map(str, bad[:10]))))
+                upload_df = upload_df.assign(value=values).loc[~upload_df['series_id'].isin(bad),
+                                                               ['series_id', 'date', 'value']]
+                if not upload_df.empty:
+                    st.session_state['batch_panel'] = upload_df
+            else:
+                st.error(txt['missing_columns'])
+        except Exception as e:
+            st.error(f"Error loading file: {e}")
+    
+    n_regions = st.slider(txt['demo_series'], 5, 200, 34)
+    if st.button(txt['gen_panel']):
+        rng = np.random.default_rng()
+        dates = pd.date_range(start='2020-01-01', periods=n_points, freq='M')
+        t = np.arange(n_points)
+        st.session_state['batch_panel'] = pd.DataFrame({
+            'series_id': np.repeat([f"Region {i + 1:03d}" for i in range(n_regions)], n_points),
+            'date': np.tile(dates, n_regions),
+            'value': (rng.uniform(95, 105, (n_regions, 1)) + rng.uniform(0.1, 0.5, (n_regions, 1)) * t
+                      + rng.uniform(0.5, 3, (n_regions, 1)) * np.sin(2 * np.pi * t / 12)
+                      + rng.normal(0, 0.5, (n_regions, n_points))).ravel()
+        })
+    
+    batch_method = st.selectbox(txt['batch_method'], ['holt_winters', 'arima'],
+                                format_func=lambda x: txt['tab1'] if x == 'holt_winters' else txt['auto_arima'])
+    horizon_batch = st.slider(txt['horizon'], 1, 24, 12, key='batch_horizon')
+    
+    if 'batch_panel' in st.session_state:
+        batch_panel = st.session_state['batch_panel']
+        st.caption(txt['panel_info'].format(n=batch_panel['series_id'].nunique(), rows=len(batch_panel)))
+        
+        if st.button(txt['run_batch'], type='primary'):
+            spec = ('add', 'add', 12) if batch_method == 'holt_winters' else 'auto'
+            with st.spinner(txt['run_batch']):
+                forecasts, report = batch_forecast(batch_panel, batch_method, spec, horizon_batch)
+            st.session_state['batch_result'] = (forecasts, report)
+
+with bcol2:
+    if 'batch_result' in st.session_state:
+        forecasts, report = st.session_state['batch_result']
+        
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric(txt['n_series'], report['n_series'])
+        r2.metric(txt['batch_seconds'], f"{report['seconds']:.2f}")
+        r3.metric(txt['throughput'], f"{report['series_per_sec']:.1f}")
+        r4.metric(txt['failed_series'], report['n_failed'])
+        
+        if report['failed']:
+            with st.expander(txt['failed_series']):
+                st.dataframe(pd.DataFrame(list(report['failed'].items()), columns=['series_id', 'error']),
+                             use_container_width=True, hide_index=True)
+        
+        if not forecasts.empty:
+            series_ids = forecasts['series_id'].unique()
+            shown = st.selectbox(txt['select_series'], series_ids)
+            history = st.session_state['batch_panel']
+            history = history[history['series_id'] == shown]
+            future = forecasts[forecasts['series_id'] == shown]
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=history['date'], y=history['value'], mode='lines',
+                                     name=txt['actual'], line=dict(color='steelblue')))
+            fig.add_trace(go.Scatter(x=pd.concat([future['date'], future['date'][::-1]]),
+                                     y=pd.concat([future['upper'], future['lower'][::-1]]),
+                                     fill='toself', fillcolor='rgba(255,165,0,0.2)', line=dict(width=0),
+                                     name=txt['interval']))
+            fig.add_trace(go.Scatter(x=future['date'], y=future['forecast'], mode='lines',
+                                     name=txt['forecast'], line=dict(color='orange', dash='dash')))
+            fig.update_layout(title=f"{shown} - {txt['chart_title']}", xaxis_title=txt['date'],
+                              yaxis_title=txt['value'], height=400, hovermode='x unified')
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.download_button(txt['download'], forecasts.to_csv(index=False).encode('utf-8'),
+                               file_name='batch_forecasts.csv', mime='text/csv')
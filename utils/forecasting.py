@@ -0,0 +1,512 @@
+import hashlib
+import os
+import pickle
+import signal
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from statsmodels.tsa.stattools import adfuller
+
+FIT_TIMEOUT = 20                 # Seconds allowed for one candidate fit
+MAX_D = 2
+UNIT_ROOT_TOL = 1.01               # AR/MA roots closer than this to the unit circle are rejected
+# Stepwise search: starting orders and the (p, q) moves tried around the current best
+SEED_ORDERS = [(2, 2), (0, 0), (1, 0), (0, 1)]
+NEIGHBOUR_STEPS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (1, -1), (-1, 1)]
+MODEL_CACHE_BYTES = 64 * 1024 ** 2   # Memory budget of the fitted-model cache
+MAX_APPEND = 24                  # Newest rows an incremental ARIMA update looks back over
+FAN_HORIZON = 24                 # Paths are simulated once to the longest horizon and sliced
+FAN_REPETITIONS = 2000
+
+_model_cache = OrderedDict()     # key -> (fitted result, size in bytes), least recently used first
+_model_cache_bytes = 0
+_model_cache_lock = threading.Lock()
+
+
+@contextmanager
+def _time_limit(seconds):
+    """Raise TimeoutError after `seconds`; a no-op where SIGALRM is unavailable (Windows, non-main threads)"""
+    if not seconds or not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _expire(signum, frame):
+        raise TimeoutError
+
+    previous = signal.signal(signal.SIGALRM, _expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+# ==================== FITTED-MODEL CACHE ====================
+# Fitted results are keyed on a hash of the series (values and index) plus the model
+# spec, so an unchanged series is never refit; forecasting a new horizon from a cached
+# result only runs the O(horizon) forecast recursion.
+
+def series_hash(values):
+    """Content hash of a series (values and index) or array"""
+    if isinstance(values, pd.Series):
+        data = pd.util.hash_pandas_object(values).values.tobytes()
+    else:
+        data = np.ascontiguousarray(values, dtype=float).tobytes()
+    return hashlib.sha1(data).hexdigest()
+
+
+def get_cached_model(key):
+    """Cached fitted result for a key (marking it most recently used), or None"""
+    with _model_cache_lock:
+        if key not in _model_cache:
+            return None
+        _model_cache.move_to_end(key)
+        return _model_cache[key][0]
+
+
+def put_cached_model(key, result, max_bytes=MODEL_CACHE_BYTES):
+    """Store a fitted result, evicting least recently used entries beyond the memory budget"""
+    global _model_cache_bytes
+    size = len(pickle.dumps(result))
+    if size > max_bytes:
+        return
+
+    with _model_cache_lock:
+        if key in _model_cache:
+            _model_cache_bytes -= _model_cache.pop(key)[1]
+        _model_cache[key] = (result, size)
+        _model_cache_bytes += size
+        while _model_cache_bytes > max_bytes:
+            _model_cache_bytes -= _model_cache.popitem(last=False)[1][1]
+
+
+def cached_fit(kind, values, spec, fit):
+    """Return the cached result for (kind, series, spec), calling fit() only on a miss"""
+    key = (kind, series_hash(values), spec)
+    result = get_cached_model(key)
+    if result is None:
+        result = fit()
+        put_cached_model(key, result)
+    return result
+
+
+def fit_holt_winters(values, trend, seasonal, seasonal_periods):
+    """Holt-Winters fit through the model cache"""
+    return cached_fit('holt_winters', values, (trend, seasonal, seasonal_periods),
+                      lambda: ExponentialSmoothing(values, trend=trend, seasonal=seasonal,
+                                                   seasonal_periods=seasonal_periods,
+                                                   initialization_method="estimated").fit())
+
+
+def update_arima(values, order, max_new=MAX_APPEND):
+    """ARIMA results for a series that extends a cached fit, without re-estimating.
+
+    Looks for a cached fit of the same order on a prefix of the series (up to max_new rows
+    shorter) and filters the new rows through that estimated state-space model with
+    append(), which costs milliseconds instead of a full MLE. Returns (result, n_new),
+    where n_new counts the observations not used for estimation, or (None, 0) if no
+    cached prefix exists.
+    """
+    order = tuple(order)
+    result = get_cached_model(('arima', series_hash(values), order))
+    if result is not None:
+        return result, result.nobs - getattr(result, 'estimated_nobs', result.nobs)
+
+    for n_prefix in range(len(values) - 1, max(len(values) - max_new, 0) - 1, -1):
+        prefix = values[:n_prefix]
+        previous = get_cached_model(('arima', series_hash(prefix), order))
+        if previous is not None:
+            result = previous.append(values[n_prefix:], refit=False)
+            result.estimated_nobs = getattr(previous, 'estimated_nobs', previous.nobs)
+            put_cached_model(('arima', series_hash(values), order), result)
+            return result, result.nobs - result.estimated_nobs
+    return None, 0
+
+
+def _fully_estimated(result, values):
+    """True unless the result was extended by update_arima past the rows it was estimated on"""
+    return getattr(result, 'estimated_nobs', result.nobs) >= len(values)
+
+
+def fit_arima(values, order, refit=False, incremental=False):
+    """ARIMA fit through the model cache.
+
+    incremental=True extends a cached fit of a prefix of the series with update_arima
+    instead of re-estimating; otherwise only a cached fit estimated on the whole series is
+    reused. refit=True always re-estimates the parameters by MLE and replaces the cached entry.
+    """
+    order = tuple(order)
+    if not refit:
+        if incremental:
+            result, _ = update_arima(values, order)
+        else:
+            result = get_cached_model(('arima', series_hash(values), order))
+            if result is not None and not _fully_estimated(result, values):
+                result = None
+        if result is not None:
+            return result
+
+    result = ARIMA(values, order=order).fit()
+    put_cached_model(('arima', series_hash(values), order), result)
+    return result
+
+
+# ==================== ARIMA ORDER SEARCH ====================
+
+def _fit_candidate(task):
+    """Worker: fit one ARIMA order and return its criteria together with the fitted result"""
+    values, order, timeout = task
+    candidate = {'order': order, 'aic': np.inf, 'bic': np.inf, 'status': 'ok', 'result': None}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            with _time_limit(timeout):
+                result = ARIMA(values, order=order).fit()
+        except TimeoutError:
+            candidate['status'] = 'timeout'
+            return candidate
+        except Exception:
+            candidate['status'] = 'failed'
+            return candidate
+
+    # Like auto.arima, reject fits with AR/MA roots on or near the unit circle (their
+    # likelihood is degenerate and the AIC meaningless)
+    roots = np.abs(np.concatenate([result.arroots, result.maroots]))
+    if not np.isfinite(result.aic) or np.any(roots < UNIT_ROOT_TOL):
+        candidate['status'] = 'unstable'
+        return candidate
+
+    candidate.update(aic=result.aic, bic=result.bic, result=result)
+    return candidate
+
+
+def fit_orders(values, orders, n_workers=None, fit_timeout=FIT_TIMEOUT):
+    """Fit several ARIMA orders, on a process pool when more than one worker is available.
+
+    Orders already in the model cache (estimated on the full series) are not refit, and
+    new fits are added to it. Every fit runs under its own timeout (enforced inside the
+    worker process). Returns one candidate dict per order with 'order', 'aic', 'bic',
+    'status' and the fitted 'result'.
+    """
+    digest = series_hash(values)
+    candidates = {}
+    for order in map(tuple, orders):
+        result = get_cached_model(('arima', digest, order))
+        # Incrementally appended results carry no MLE AIC for this series; refit those
+        if result is not None and _fully_estimated(result, values):
+            candidates[order] = {'order': order, 'aic': result.aic, 'bic': result.bic,
+                                 'status': 'ok', 'result': result}
+
+    tasks = [(values, tuple(order), fit_timeout) for order in orders if tuple(order) not in candidates]
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            fitted = list(pool.map(_fit_candidate, tasks))
+    else:
+        fitted = [_fit_candidate(task) for task in tasks]
+
+    for candidate in fitted:
+        if candidate['result'] is not None:
+            put_cached_model(('arima', digest, candidate['order']), candidate['result'])
+        candidates[candidate['order']] = candidate
+    return [candidates[tuple(order)] for order in orders]
+
+
+def rank_candidates(candidates, criterion='aic'):
+    """Candidates as a table sorted by the criterion (failed or timed-out fits last)"""
+    table = pd.DataFrame([{
+        'Model': 'ARIMA({},{},{})'.format(*c['order']),
+        'AIC': c['aic'],
+        'BIC': c['bic'],
+        'Status': c['status']
+    } for c in candidates])
+    return table.sort_values(criterion.upper(), kind='stable').reset_index(drop=True)
+
+
+def arima_grid_search(values, p_values=range(3), d_values=range(2), q_values=range(3),
+                      criterion='aic', n_workers=None, fit_timeout=FIT_TIMEOUT):
+    """Exhaustive (p, d, q) search in parallel.
+
+    Returns (ranking table, best candidate); the best candidate carries its fitted result,
+    so the winner never has to be refit.
+    """
+    orders = [(p, d, q) for p in p_values for d in d_values for q in q_values]
+    candidates = fit_orders(values, orders, n_workers, fit_timeout)
+
+    fitted = [c for c in candidates if c['result'] is not None]
+    if not fitted:
+        raise ValueError("No ARIMA order could be fitted")
+    best = min(fitted, key=lambda c: c[criterion])
+    return rank_candidates(candidates, criterion), best
+
+
+def select_d(values, alpha=0.05, max_d=MAX_D):
+    """Differencing order from repeated ADF tests: difference until a unit root is rejected"""
+    x = np.asarray(values, dtype=float)
+    for d in range(max_d):
+        if adfuller(x)[1] < alpha:
+            return d
+        x = np.diff(x)
+    return max_d
+
+
+def stepwise_arima(values, max_p=5, max_q=5, d=None, criterion='aic', n_workers=None,
+                   fit_timeout=FIT_TIMEOUT):
+    """Hyndman-Khandakar style stepwise search over (p, q) with d fixed by unit-root tests.
+
+    Fits a few seed orders, then repeatedly fits the unvisited neighbours of the current
+    best (in parallel) and moves only while the criterion improves. Returns (ranking table
+    of every order fitted, best candidate with its fitted result, d).
+    """
+    d = select_d(values) if d is None else d
+    in_bounds = lambda p, q: 0 <= p <= max_p and 0 <= q <= max_q
+
+    candidates = {}
+    best = None
+    batch = [(p, d, q) for p, q in SEED_ORDERS if in_bounds(p, q)]
+    while batch:
+        for candidate in fit_orders(values, batch, n_workers, fit_timeout):
+            candidates[candidate['order']] = candidate
+
+        fitted = [candidates[order] for order in batch if candidates[order]['result'] is not None]
+        step_best = min(fitted, key=lambda c: c[criterion], default=None)
+        if step_best is None or (best is not None and step_best[criterion] >= best[criterion]):
+            break
+        best = step_best
+
+        p, _, q = best['order']
+        batch = [(p + dp, d, q + dq) for dp, dq in NEIGHBOUR_STEPS
+                 if in_bounds(p + dp, q + dq) and (p + dp, d, q + dq) not in candidates]
+
+    if best is None:
+        raise ValueError("No ARIMA order could be fitted")
+    return rank_candidates(list(candidates.values()), criterion), best, d
+
+
+# ==================== BATCH FORECASTING ====================
+
+def future_dates(dates, horizon):
+    """Dates following a series, at its inferred frequency (median spacing if irregular)"""
+    dates = pd.DatetimeIndex(dates)
+    freq = pd.infer_freq(dates) if len(dates) >= 3 else None
+    if freq is not None:
+        return pd.date_range(dates[-1], periods=horizon + 1, freq=freq)[1:]
+    step = pd.Series(dates).diff().median() if len(dates) > 1 else pd.Timedelta(days=30)
+    return pd.DatetimeIndex([dates[-1] + step * (i + 1) for i in range(horizon)])
+
+
+def simulate_future(result, method, horizon, repetitions=FAN_REPETITIONS, seed=0):
+    """(horizon, repetitions) array of future paths simulated from the end of the sample.
+
+    Holt-Winters paths bootstrap the in-sample residuals; ARIMA paths draw Gaussian
+    innovations from the state-space model. All repetitions are generated in one call.
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'arima':
+        paths = result.simulate(horizon, repetitions=repetitions, anchor='end', rng=rng)
+    else:
+        paths = result.simulate(horizon, repetitions=repetitions, error='add', anchor='end',
+                                random_errors='bootstrap', rng=rng)
+    return np.asarray(paths, dtype=float).reshape(horizon, -1)
+
+
+def forecast_with_intervals(result, method, horizon, alpha=0.05, repetitions=500, seed=0):
+    """Point forecast and (1 - alpha) interval bounds as three arrays.
+
+    ARIMA uses its analytic state-space intervals; Holt-Winters has none, so they come
+    from quantiles of simulated paths.
+    """
+    if method == 'arima':
+        forecast = result.get_forecast(horizon)
+        bounds = np.asarray(forecast.conf_int(alpha=alpha))
+        return np.asarray(forecast.predicted_mean), bounds[:, 0], bounds[:, 1]
+
+    paths = simulate_future(result, method, horizon, repetitions, seed)
+    lower, upper = np.quantile(paths, [alpha / 2, 1 - alpha / 2], axis=1)
+    return np.asarray(result.forecast(horizon)), lower, upper
+
+
+def _forecast_one(task):
+    """Worker: fit and forecast one series of the panel; failures are reported, not raised"""
+    series_id, dates, values, method, spec, horizon, alpha = task
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        try:
+            values = pd.Series(values)
+            if method == 'arima':
+                result = stepwise_arima(values, n_workers=1)[1]['result'] if spec == 'auto' else fit_arima(values, spec)
+            else:
+                result = fit_holt_winters(values, *spec)
+            forecast, lower, upper = forecast_with_intervals(result, method, horizon, alpha)
+        except Exception as e:
+            return series_id, None, str(e)
+
+    return series_id, pd.DataFrame({
+        'series_id': series_id,
+        'date': future_dates(dates, horizon),
+        'forecast': forecast,
+        'lower': lower,
+        'upper': upper
+    }), None
+
+
+def batch_forecast(panel, method='holt_winters', spec=('add', None, 12), horizon=12, alpha=0.05,
+                   n_workers=None):
+    """Forecast every series of a long (series_id, date, value) panel, in parallel.
+
+    method is 'holt_winters' (spec = (trend, seasonal, seasonal_periods)) or 'arima'
+    (spec = (p, d, q) or 'auto' for a stepwise search per series). Returns (stacked
+    forecast frame with interval bounds, report dict with timings, throughput and the
+    ids of series that failed).
+    """
+    start = time.perf_counter()
+    panel = panel.sort_values(['series_id', 'date'])
+    tasks = [(series_id, group['date'].values, group['value'].to_numpy(dtype=float), method, spec, horizon, alpha)
+             for series_id, group in panel.groupby('series_id', sort=False)]
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            outcomes = list(pool.map(_forecast_one, tasks, chunksize=max(1, len(tasks) // (4 * n_workers))))
+    else:
+        outcomes = [_forecast_one(task) for task in tasks]
+
+    frames = [frame for _, frame, _ in outcomes if frame is not None]
+    failed = {series_id: error for series_id, _, error in outcomes if error is not None}
+    elapsed = time.perf_counter() - start
+
+    forecasts = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['series_id', 'date', 'forecast', 'lower', 'upper'])
+    return forecasts, {
+        'n_series': len(tasks),
+        'n_failed': len(failed),
+        'failed': failed,
+        'seconds': elapsed,
+        'series_per_sec': len(tasks) / elapsed if elapsed > 0 else np.inf,
+        'n_workers': n_workers
+    }
+
+
+# ==================== ROLLING-ORIGIN BACKTEST ====================
+
+def rolling_origins(n_obs, initial, horizon, step=1):
+    """Forecast origins (training-set lengths) that leave a full horizon of actuals"""
+    return list(range(initial, n_obs - horizon + 1, step))
+
+
+def _warm_params(result, method):
+    """Estimated parameters in the layout fit(start_params=...) expects"""
+    if method == 'arima':
+        return np.asarray(result.params)
+    return getattr(getattr(result, 'mle_retvals', None), 'x', None)
+
+
+def _fit_fold(values, method, spec, start_params):
+    """Fit one training window, warm-started from neighbouring parameters when available"""
+    if method == 'arima':
+        return ARIMA(values, order=spec).fit(start_params=start_params)
+
+    model = ExponentialSmoothing(values, trend=spec[0], seasonal=spec[1], seasonal_periods=spec[2],
+                                 initialization_method="estimated")
+    if start_params is not None:
+        try:
+            # A warm start skips the brute-force grid over smoothing parameters
+            return model.fit(start_params=start_params, use_brute=False)
+        except Exception:
+            pass
+    return model.fit()
+
+
+def _backtest_block(task):
+    """Worker: run a contiguous block of folds in order, each warm-started from the previous fit"""
+    values, method, spec, origins, horizon, window = task
+    # The first fold starts cold: it sees nothing but its own training window
+    start_params = None
+    rows = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for origin in origins:
+            train = values[max(0, origin - window) if window else 0:origin]
+            actual = values[origin:origin + horizon]
+            try:
+                result = _fit_fold(train, method, spec, start_params)
+                forecast = np.asarray(result.forecast(horizon))
+                start_params = _warm_params(result, method)
+            except Exception:
+                forecast = np.full(horizon, np.nan)
+            rows.extend((origin, h + 1, actual[h], forecast[h]) for h in range(horizon))
+    return rows
+
+
+def backtest(values, method='holt_winters', spec=('add', None, 12), initial=24, horizon=6, step=1,
+             window=None, n_workers=None):
+    """Rolling-origin (expanding, or rolling with window=n) out-of-sample evaluation.
+
+    Folds are split into contiguous blocks, one per worker; inside a block every refit is
+    warm-started from the preceding fold's parameters, which were estimated on data before
+    its origin, so no fold sees its test window. Returns (per-fold errors, error summary
+    by horizon step).
+    """
+    values = np.asarray(values, dtype=float)
+    origins = rolling_origins(len(values), initial, horizon, step)
+    if not origins:
+        raise ValueError("Series too short for this initial window and horizon")
+
+    n_workers = min(n_workers or os.cpu_count() or 1, len(origins))
+    tasks = [(values, method, spec, list(block), horizon, window)
+             for block in np.array_split(origins, n_workers)]
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            blocks = list(pool.map(_backtest_block, tasks))
+    else:
+        blocks = [_backtest_block(task) for task in tasks]
+
+    errors = pd.DataFrame([row for block in blocks for row in block],
+                          columns=['origin', 'step', 'actual', 'forecast'])
+    errors['error'] = errors['actual'] - errors['forecast']
+
+    abs_error = errors['error'].abs()
+    summary = pd.DataFrame({
+        'MAE': abs_error.groupby(errors['step']).mean(),
+        'RMSE': np.sqrt((errors['error'] ** 2).groupby(errors['step']).mean()),
+        # Zero actuals have no percentage error; they are left out of the MAPE
+        'MAPE': (abs_error / errors['actual'].abs().where(errors['actual'] != 0) * 100).groupby(errors['step']).mean()
+    })
+    return errors, summary
+
+
+# ==================== FAN CHARTS ====================
+
+def cached_paths(method, values, spec, repetitions=FAN_REPETITIONS, seed=0):
+    """Simulated paths to FAN_HORIZON for a (cached) fit, themselves kept in the model cache.
+
+    Slicing the first h rows gives valid h-step paths, so neither a new horizon nor new
+    band widths trigger another simulation.
+    """
+    # The same result the page just used, including an incrementally updated ARIMA
+    result = fit_arima(values, spec, incremental=True) if method == 'arima' else fit_holt_winters(values, *spec)
+    # An incrementally updated ARIMA and its re-estimated refit get separate entries
+    estimated_nobs = getattr(result, 'estimated_nobs', None)
+    return cached_fit('paths', values, (method, spec, estimated_nobs, repetitions, seed),
+                      lambda: simulate_future(result, method, FAN_HORIZON, repetitions, seed))
+
+
+def fan_bands(paths, levels=(50, 80, 95)):
+    """Median and central percentile bands of simulated paths from one quantile call.
+
+    Returns (median, {level: (lower, upper)}) with one value per horizon step.
+    """
+    levels = sorted(levels)
+    probs = [0.5] + [p for level in levels for p in ((100 - level) / 200, (100 + level) / 200)]
+    quantiles = np.quantile(paths, probs, axis=1)
+    return quantiles[0], {level: (quantiles[1 + 2 * i], quantiles[2 + 2 * i]) for i, level in enumerate(levels)}
@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.signal import lfilter
+
+
+def simulate_taylor_paths(current_gdp, inflation, unemployment, rate, shocks, periods=12,
+                          neutral_rate=None, target_inflation=3.0, min_rate=2.0, max_rate=10.0,
+                          shock_period=2):
+    """Simulate GDP, inflation, unemployment and policy-rate paths under a Taylor rule.
+
+    shocks is an (n_scenarios, 3) array of (demand %, supply pp, financial pp) shocks that
+    hit in shock_period; a zero entry leaves that channel to the normal dynamics. The
+    recursion steps over periods once, vectorized across all scenarios, and returns
+    (n_scenarios, periods) arrays.
+    """
+    shocks = np.atleast_2d(np.asarray(shocks, dtype=float))
+    n_scenarios = len(shocks)
+    neutral_rate = rate if neutral_rate is None else neutral_rate
+
+    gdp_path = np.zeros((n_scenarios, periods))
+    inflation_path = np.zeros((n_scenarios, periods))
+    unemployment_path = np.zeros((n_scenarios, periods))
+    rate_path = np.zeros((n_scenarios, periods))
+
+    gdp_path[:, 0] = current_gdp
+    inflation_path[:, 0] = inflation
+    unemployment_path[:, 0] = unemployment
+    rate_path[:, 0] = rate
+
+    no_shock = np.zeros(n_scenarios, dtype=bool)
+    demand_hit, supply_hit, financial_hit = (shocks != 0).T
+
+    for t in range(1, periods):
+        shocked = t == shock_period
+
+        # Policy rate: held until the Taylor rule reacts after the shock period
+        if t > shock_period:
+            inflation_gap = inflation_path[:, t-1] - target_inflation
+            output_gap = (gdp_path[:, t-1] - current_gdp) / current_gdp * 100
+            rate_path[:, t] = np.clip(neutral_rate + 0.5 * inflation_gap + 0.5 * output_gap, min_rate, max_rate)
+        else:
+            rate_path[:, t] = rate_path[:, t-1] + (shocks[:, 2] if shocked else 0)
+
+        rate_change = rate_path[:, t] - rate_path[:, t-1]
+        gdp_growth = -0.5 * rate_change + 0.3 * (inflation_path[:, t-1] - 2)
+
+        # Shocked channels jump; every other channel follows the dynamics
+        gdp_path[:, t] = np.where(demand_hit if shocked else no_shock,
+                                  gdp_path[:, t-1] * (1 + shocks[:, 0]/100),
+                                  gdp_path[:, t-1] * (1 + gdp_growth/100))
+        inflation_path[:, t] = np.where(supply_hit if shocked else no_shock,
+                                        inflation_path[:, t-1] + shocks[:, 1],
+                                        inflation_path[:, t-1] + 0.2 * gdp_growth - 0.3 * rate_change)
+        unemployment_path[:, t] = unemployment_path[:, t-1] - 0.5 * gdp_growth
+
+    return {
+        'gdp': gdp_path,
+        'inflation': inflation_path,
+        'unemployment': unemployment_path,
+        'rate': rate_path
+    }
+
+
+def resilience_metrics(gdp_path, inflation_path, unemployment_path, current_gdp, shock_period=2):
+    """Drawdown, recovery time and resilience score for stacked (n_scenarios, periods) paths"""
+    periods = gdp_path.shape[1]
+    max_drawdown = ((gdp_path - current_gdp) / current_gdp * 100).min(axis=1)
+
+    # Quarters from the shock until GDP is back within 1% of baseline (periods if never)
+    recovered = gdp_path[:, shock_period:] >= current_gdp * 0.99
+    recovery_time = np.where(recovered.any(axis=1), recovered.argmax(axis=1), periods)
+
+    return {
+        'max_drawdown': max_drawdown,
+        'recovery_time': recovery_time,
+        'avg_inflation': inflation_path.mean(axis=1),
+        'max_unemployment': unemployment_path.max(axis=1),
+        'resilience_score': np.maximum(0, 100 - np.abs(max_drawdown) * 10 - recovery_time * 5)
+    }
+
+
+def simulate_rate_transmission(rate_change, periods, lag, base_inflation=3.0, base_unemployment=5.5,
+                               inflation_persistence=0.5):
+    """Monetary transmission of a rate change, vectorized over scenarios.
+
+    rate_change and lag broadcast against each other (scalars give 1-D paths). The output
+    gap has a closed form; the AR(1) inflation recursion
+    pi[t] = base + 0.3 * gap[t] + persistence * pi[t-1] is solved as a linear filter.
+    """
+    rate_change = np.asarray(rate_change, dtype=float)[..., None]
+    lag = np.asarray(lag)[..., None]
+    t = np.arange(periods)
+
+    # Output gap response (with lag)
+    output_response = np.where(t >= lag, -0.5 * rate_change * (1 - np.exp(-(t - lag) / 3)), 0.0)
+
+    # Inflation response (follows output gap); the first period starts at base inflation
+    impulse = base_inflation + 0.3 * output_response
+    impulse[..., 0] = base_inflation
+    inflation_response = lfilter([1.0], [1.0, -inflation_persistence], impulse, axis=-1)
+
+    # Unemployment response (Okun's Law)
+    unemployment_response = base_unemployment - 0.5 * output_response
+
+    return {
+        'time': t,
+        'output': output_response,
+        'inflation': inflation_response,
+        'unemployment': unemployment_response
+    }
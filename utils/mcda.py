@@ -0,0 +1,273 @@
+import numpy as np
+import pandas as pd
+
+# A criteria spec is a list of dicts with at least 'column' (source column) and
+# 'benefit' (True if higher is better, False for cost criteria); pages add their own
+# keys (labels, default weights). Everything below works on an (n_regions, n_criteria)
+# decision matrix so the region count and the criteria set are arbitrary.
+
+
+def load_regions(source, criteria, name_column='Region'):
+    """Read candidate regions from a CSV or Parquet path or uploaded file.
+
+    Raises ValueError naming any missing columns; criteria columns are coerced to numbers
+    (unparseable cells become missing).
+    """
+    name = getattr(source, 'name', str(source))
+    df = pd.read_parquet(source) if name.lower().endswith('.parquet') else pd.read_csv(source)
+
+    required = [name_column] + [c['column'] for c in criteria]
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    df = df[required].copy()
+    for c in criteria:
+        df[c['column']] = pd.to_numeric(df[c['column']], errors='coerce')
+    return df.reset_index(drop=True)
+
+
+def decision_matrix(df, criteria):
+    """(n_regions, n_criteria) float matrix of the spec's columns"""
+    return df[[c['column'] for c in criteria]].to_numpy(dtype=float)
+
+
+def benefit_mask(criteria):
+    """Boolean vector, True for benefit (higher is better) criteria"""
+    return np.array([c['benefit'] for c in criteria], dtype=bool)
+
+
+def normalize_weights(weights):
+    """Weights (any positive scale, e.g. percentages) rescaled to sum to one"""
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+
+def minmax_normalize(X, benefit):
+    """Min-max normalization to [0, 1] in one broadcast, reversing cost criteria.
+
+    Missing values are ignored when taking the range and stay missing; a criterion with
+    no spread scores 0.5 for every region.
+    """
+    lo, hi = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+    span = hi - lo
+    norm = np.where(benefit, X - lo, hi - X) / np.where(span > 0, span, 1)
+    return np.where(span > 0, norm, np.where(np.isnan(X), np.nan, 0.5))
+
+
+def weighted_sum(norm, weights):
+    """Weighted-sum scores (0-100) and the (n_regions, n_criteria) contribution matrix in points"""
+    contributions = norm * normalize_weights(weights) * 100
+    return contributions.sum(axis=1), contributions
+
+
+# ==================== WEIGHT SENSITIVITY ====================
+
+CHUNK_ELEMENTS = 4_000_000       # Scores held in memory per chunk (samples x regions)
+MAX_RANKS = 20                   # Rank positions tracked individually; lower ranks are pooled
+MEAN_RANK_ELEMENTS = 5_000_000   # Scores fully sorted (samples x regions) to estimate mean ranks
+
+
+def sample_weights(weights, n_samples, concentration, rng):
+    """Dirichlet draws centred on the given weights (zero-weight criteria stay at zero)"""
+    weights = normalize_weights(weights)
+    active = weights > 0
+    sampled = np.zeros((n_samples, len(weights)))
+    sampled[:, active] = rng.dirichlet(concentration * weights[active], n_samples)
+    return sampled
+
+
+def _top_ranks(scores, n_top):
+    """(samples, n_top) region indices in rank order; ties keep the lower region index first"""
+    if n_top < scores.shape[1]:
+        candidates = np.argpartition(-scores, n_top - 1, axis=1)[:, :n_top]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    top_scores = np.take_along_axis(scores, candidates, axis=1)
+    return np.take_along_axis(candidates, np.lexsort((candidates, -top_scores)), axis=1)
+
+
+def rank_stability(norm, weights, n_samples=200_000, concentration=100, seed=42):
+    """Monte Carlo rank robustness of weighted-sum scores under weight uncertainty.
+
+    Weight vectors are drawn from Dirichlet(concentration * w), so a larger concentration
+    keeps them closer to w. Each chunk is scored with one matrix multiply and only its top
+    MAX_RANKS positions are selected (argpartition, linear in the region count) before the
+    next is drawn, keeping memory bounded for any sample size. Mean ranks need a full sort,
+    so they are estimated from the first MEAN_RANK_ELEMENTS / n_regions samples.
+    Returns 'p_first' and 'mean_rank' per region and 'rank_counts' (n_regions x
+    min(n_regions, MAX_RANKS + 1)), whose last column pools ranks beyond MAX_RANKS.
+    """
+    rng = np.random.default_rng(seed)
+    values = np.nan_to_num(norm, nan=0.0)
+    n_regions = len(values)
+    n_slots = min(n_regions, MAX_RANKS + 1)
+    n_top = n_regions if n_slots == n_regions else MAX_RANKS
+    chunk_size = max(1, CHUNK_ELEMENTS // max(n_regions, 1))
+
+    rank_counts = np.zeros((n_regions, n_slots), dtype=np.int64)
+    rank_sums = np.zeros(n_regions)
+    n_sorted, n_mean_samples = 0, max(100, MEAN_RANK_ELEMENTS // max(n_regions, 1))
+    region_ids = np.arange(n_regions)
+
+    for start in range(0, n_samples, chunk_size):
+        k = min(chunk_size, n_samples - start)
+        scores = sample_weights(weights, k, concentration, rng) @ values.T
+
+        # Rank 0 is best
+        top = _top_ranks(scores, n_top)
+        rank_counts[:, :n_top] += np.bincount((top * n_slots + np.arange(n_top)).ravel(),
+                                              minlength=n_regions * n_slots).reshape(n_regions, n_slots)[:, :n_top]
+
+        m = min(k, n_mean_samples - n_sorted)
+        if m > 0:
+            order = np.argsort(-scores[:m], axis=1, kind='stable')
+            ranks = np.empty_like(order)
+            ranks[np.arange(m)[:, None], order] = region_ids
+            rank_sums += ranks.sum(axis=0)
+            n_sorted += m
+
+    if n_top < n_slots:
+        rank_counts[:, -1] = n_samples - rank_counts[:, :-1].sum(axis=1)
+
+    return {
+        'p_first': rank_counts[:, 0] / n_samples,
+        'mean_rank': rank_sums / n_sorted + 1,
+        'rank_counts': rank_counts,
+        'n_samples': n_samples
+    }
+
+
+# ==================== PARETO FILTER ====================
+
+PARETO_BLOCK = 256               # Candidates compared against the current front at once
+PARETO_FRONT_STEP = 256          # Front rows per comparison step (block x step booleans)
+
+
+def _dominated(block, front):
+    """For each row of block, whether some row of front is at least as good everywhere and better somewhere"""
+    dominated = np.zeros(len(block), dtype=bool)
+    for start in range(0, len(front), PARETO_FRONT_STEP):
+        # Rows already known to be dominated are not compared again
+        pending = np.flatnonzero(~dominated)
+        if pending.size == 0:
+            break
+        rows, other = block[pending], front[start:start + PARETO_FRONT_STEP]
+
+        # At least as good on every criterion and not identical, one criterion at a time
+        at_least = np.ones((len(rows), len(other)), dtype=bool)
+        identical = np.ones_like(at_least)
+        for k in range(block.shape[1]):
+            at_least &= other[None, :, k] >= rows[:, k, None]
+            identical &= other[None, :, k] == rows[:, k, None]
+        dominated[pending] = (at_least & ~identical).any(axis=1)
+    return dominated
+
+
+def pareto_front(X, benefit):
+    """Boolean mask of non-dominated regions (missing values count as worst).
+
+    Candidates are visited by descending sum of normalized criteria (a dominator always
+    has the larger sum), so a region can only be dominated by one visited earlier. Each
+    block is checked against the front found so far; by transitivity, dominated regions
+    never need to be compared against, and strong front members come first, so most
+    dominated regions are rejected after a few comparisons.
+    """
+    oriented = np.where(benefit, X, -X)
+    oriented = np.where(np.isnan(oriented), -np.inf, oriented)
+    order = np.argsort(-np.nan_to_num(minmax_normalize(X, benefit), nan=-1.0).sum(axis=1), kind='stable')
+
+    keep = np.zeros(len(X), dtype=bool)
+    front = oriented[:0]
+    for start in range(0, len(order), PARETO_BLOCK):
+        idx = order[start:start + PARETO_BLOCK]
+        block = oriented[idx]
+        survivors = ~_dominated(block, front) & ~_dominated(block, block)
+        keep[idx[survivors]] = True
+        front = np.concatenate([front, block[survivors]])
+    return keep
+
+
+# ==================== TOPSIS / PROMETHEE II / AHP ====================
+
+PROMETHEE_ELEMENTS = 2_000_000   # Pairwise preferences held in memory per block (rows x regions)
+# Saaty's random consistency index by matrix size
+RANDOM_INDEX = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49,
+                11: 1.51, 12: 1.48, 13: 1.56, 14: 1.57, 15: 1.59}
+
+
+def topsis(X, benefit, weights):
+    """TOPSIS closeness (0-1) to the ideal solution; missing values take the criterion's worst value"""
+    worst = np.where(benefit, np.nanmin(X, axis=0), np.nanmax(X, axis=0))
+    X = np.where(np.isnan(X), worst, X)
+
+    norms = np.sqrt((X ** 2).sum(axis=0))
+    V = X / np.where(norms > 0, norms, 1) * normalize_weights(weights)
+    ideal = np.where(benefit, V.max(axis=0), V.min(axis=0))
+    anti = np.where(benefit, V.min(axis=0), V.max(axis=0))
+
+    d_ideal = np.sqrt(((V - ideal) ** 2).sum(axis=1))
+    d_anti = np.sqrt(((V - anti) ** 2).sum(axis=1))
+    total = d_ideal + d_anti
+    return np.where(total > 0, d_anti / np.where(total > 0, total, 1), 0.5)
+
+
+def promethee_ii(norm, weights, q=0.05, p=0.30):
+    """PROMETHEE II net outranking flows (-1 to 1) from min-max normalized criteria.
+
+    Uses the linear preference function with indifference threshold q and preference
+    threshold p (on the normalized 0-1 scale; scalars or one value per criterion). The
+    n x n preference matrix is never materialized: rows are processed in blocks sized to
+    PROMETHEE_ELEMENTS, accumulating each block's outgoing and incoming flows.
+    """
+    values = np.nan_to_num(norm, nan=0.0)
+    n, m = values.shape
+    if n < 2:
+        return np.zeros(n)
+    w = normalize_weights(weights)
+    q = np.broadcast_to(np.asarray(q, dtype=float), (m,))
+    p = np.broadcast_to(np.asarray(p, dtype=float), (m,))
+    scale = np.maximum(p - q, 1e-12)
+
+    phi_plus = np.zeros(n)
+    phi_minus = np.zeros(n)
+    block = max(1, PROMETHEE_ELEMENTS // n)
+    for start in range(0, n, block):
+        rows = slice(start, min(start + block, n))
+        preference = np.zeros((rows.stop - start, n))
+        for k in np.flatnonzero(w > 0):
+            diff = values[rows, k, None] - values[None, :, k]
+            preference += w[k] * np.clip((diff - q[k]) / scale[k], 0, 1)
+        # preference[a, b] = pi(a, b): a's outgoing flow and b's incoming flow
+        phi_plus[rows] += preference.sum(axis=1)
+        phi_minus += preference.sum(axis=0)
+
+    return (phi_plus - phi_minus) / (n - 1)
+
+
+def ahp_weights(pairwise):
+    """AHP priority weights (principal eigenvector) and Saaty's consistency ratio.
+
+    pairwise is a reciprocal matrix where entry (i, j) says how much more important
+    criterion i is than criterion j on the 1/9-9 scale.
+    """
+    A = np.asarray(pairwise, dtype=float)
+    n = len(A)
+    eigenvalues, eigenvectors = np.linalg.eig(A)
+    principal = np.argmax(eigenvalues.real)
+    weights = np.abs(eigenvectors[:, principal].real)
+    weights /= weights.sum()
+
+    lambda_max = eigenvalues[principal].real
+    ci = max(lambda_max - n, 0.0) / (n - 1) if n > 1 else 0.0
+    ri = RANDOM_INDEX.get(n, 1.59)
+    return weights, (ci / ri if ri > 0 else 0.0)
+
+
+def pairwise_from_judgments(n, judgments):
+    """Reciprocal pairwise matrix from {(i, j): importance of i over j} for i < j"""
+    A = np.ones((n, n))
+    for (i, j), value in judgments.items():
+        A[i, j] = value
+        A[j, i] = 1 / value
+    return A
@@ -0,0 +1,240 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Draws per chunk; fixed so results depend on the seed, not on the core count
+CHUNK_SIZE = 250_000
+N_BINS = 2000
+PILOT_SIZE = 20_000
+# Bars kept in the risk result for plotting
+PLOT_BINS = 50
+
+
+def draw_uncertainty(n_sim, seed=None):
+    """Draw parameter uncertainty and shocks from a dedicated generator (seed, SeedSequence or np.random.Generator)"""
+    rng = np.random.default_rng(seed)
+
+    return {
+        # Parameter distributions (uncertainty)
+        'MPC': np.clip(rng.normal(0.75, 0.05, n_sim), 0.5, 0.9),
+        'alpha_I': np.clip(rng.normal(200, 20, n_sim), 100, 300),
+        'alpha_NX': np.clip(rng.normal(100, 15, n_sim), 50, 150),
+        # Shock distributions
+        'demand_shocks': rng.normal(0, 0.5, n_sim),
+        'supply_shocks': rng.normal(0, 0.3, n_sim)
+    }
+
+
+def simulate_policy_outcomes(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment, draws):
+    """Evaluate one policy, or an array of candidate policies, on the same draws.
+
+    Scalar G_opt/r_opt give arrays of shape (n_sim,); 1-D candidate arrays give
+    (n_candidates, n_sim), every candidate sharing the same random numbers.
+    """
+    G_opt = np.asarray(G_opt, dtype=float)[..., None]
+    rate_change = np.asarray(r_opt, dtype=float)[..., None] - r
+    current_gdp = C + I + G + NX
+
+    # Calculate with uncertainty
+    I_new = I - draws['alpha_I'] * rate_change + draws['demand_shocks'] * 100
+    NX_new = NX - draws['alpha_NX'] * rate_change + draws['demand_shocks'] * 50
+    C_new = C + draws['MPC'] * (G_opt - G) + draws['demand_shocks'] * 200
+
+    GDP_new = C_new + I_new + G_opt + NX_new
+    growth_dist = (GDP_new - current_gdp) / current_gdp * 100
+
+    # Inflation with uncertainty (output gap equals growth vs. current GDP)
+    inflation_dist = inflation + 0.3 * growth_dist - 0.2 * rate_change + draws['supply_shocks']
+
+    # Unemployment
+    unemployment_dist = unemployment - 0.5 * (growth_dist - 2)
+
+    return growth_dist, inflation_dist, unemployment_dist
+
+
+# ==================== STREAMING RISK SUMMARIES ====================
+# A summary is a small dict (count, Welford mean/M2, min/max, recession count and a
+# fixed-bin histogram with per-bin sums). Summaries over the same edges merge exactly,
+# so chunks can be reduced one at a time, in any order, in any process.
+
+def empty_summary(edges):
+    """Summary of zero draws, the identity element for merge_summaries"""
+    n_slots = len(edges) + 1
+    return {
+        'n': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'min': np.inf,
+        'max': -np.inf,
+        'n_negative': 0,
+        'counts': np.zeros(n_slots, dtype=np.int64),
+        'sums': np.zeros(n_slots)
+    }
+
+
+def summarize_draws(values, edges):
+    """Reduce an array of draws to mergeable partial moments and a fixed-bin histogram"""
+    # Edges are uniform, so the bin index is arithmetic; slot 0 collects values below
+    # edges[0] and the last slot values above edges[-1]
+    n_slots = len(edges) + 1
+    width = (edges[-1] - edges[0]) / (len(edges) - 1)
+    idx = np.clip(np.floor((values - edges[0]) / width) + 1, 0, n_slots - 1).astype(np.intp)
+
+    return {
+        'n': values.size,
+        'mean': values.mean(),
+        'm2': ((values - values.mean()) ** 2).sum(),
+        'min': values.min(),
+        'max': values.max(),
+        'n_negative': np.count_nonzero(values < 0),
+        'counts': np.bincount(idx, minlength=n_slots),
+        'sums': np.bincount(idx, weights=values, minlength=n_slots)
+    }
+
+
+def merge_summaries(a, b):
+    """Merge two partial summaries (Chan et al. parallel variance update)"""
+    n = a['n'] + b['n']
+    if n == 0:
+        return a
+    delta = b['mean'] - a['mean']
+
+    return {
+        'n': n,
+        'mean': a['mean'] + delta * b['n'] / n,
+        'm2': a['m2'] + b['m2'] + delta ** 2 * a['n'] * b['n'] / n,
+        'min': min(a['min'], b['min']),
+        'max': max(a['max'], b['max']),
+        'n_negative': a['n_negative'] + b['n_negative'],
+        'counts': a['counts'] + b['counts'],
+        'sums': a['sums'] + b['sums']
+    }
+
+
+def _slot_bounds(summary, edges):
+    """Lower and upper value bound of every histogram slot, including the overflow slots"""
+    lower = np.concatenate(([summary['min']], edges))
+    upper = np.concatenate((edges, [summary['max']]))
+    return np.minimum(lower, upper), np.maximum(lower, upper)
+
+
+def summary_quantile(summary, edges, q):
+    """Quantile(s) from the merged histogram, interpolating linearly inside a bin"""
+    q = np.atleast_1d(np.asarray(q, dtype=float))
+    cum = np.cumsum(summary['counts'])
+    target = q * summary['n']
+    slot = np.minimum(np.searchsorted(cum, target, side='left'), len(cum) - 1)
+
+    lower, upper = _slot_bounds(summary, edges)
+    before = np.where(slot > 0, cum[slot - 1], 0)
+    in_slot = np.maximum(summary['counts'][slot], 1)
+    frac = np.clip((target - before) / in_slot, 0, 1)
+
+    return lower[slot] + frac * (upper[slot] - lower[slot])
+
+
+def summary_cvar(summary, edges, alpha):
+    """Mean of the draws at or below the alpha-quantile (expected shortfall)"""
+    var = summary_quantile(summary, edges, alpha)[0]
+    lower, upper = _slot_bounds(summary, edges)
+    slot = min(np.searchsorted(upper, var, side='left'), len(upper) - 1)
+
+    # Whole slots below the VaR slot, plus the uniform share of the VaR slot up to VaR
+    tail_n = summary['counts'][:slot].sum()
+    tail_sum = summary['sums'][:slot].sum()
+    width = upper[slot] - lower[slot]
+    share = (var - lower[slot]) / width if width > 0 else 1.0
+    part_n = summary['counts'][slot] * share
+    tail_n += part_n
+    tail_sum += part_n * (lower[slot] + var) / 2
+
+    return tail_sum / tail_n if tail_n > 0 else var
+
+
+def _pilot_edges(growth, inflation, unemployment):
+    """Fixed uniform bin edges shared by all chunks, padded beyond the pilot range"""
+    edges = {}
+    for name, values in (('growth', growth), ('inflation', inflation), ('unemployment', unemployment)):
+        lo, hi = values.min(), values.max()
+        pad = max(hi - lo, 1e-9) * 0.5
+        edges[name] = np.linspace(lo - pad, hi + pad, N_BINS + 1)
+    return edges
+
+
+def compact_histogram(summary, edges, n_bars=PLOT_BINS):
+    """Coarsen the occupied part of the fixed-bin histogram to about n_bars bars for plotting"""
+    inner = summary['counts'][1:-1]
+    occupied = np.flatnonzero(inner)
+    if occupied.size == 0:
+        return {'counts': inner[:0], 'edges': edges[:1]}
+
+    starts = np.unique(np.linspace(occupied[0], occupied[-1] + 1, n_bars + 1).astype(int))
+    return {
+        'counts': np.add.reduceat(inner, starts[:-1]),
+        'edges': edges[starts]
+    }
+
+
+def _run_chunk(task):
+    """Worker: simulate one independently seeded chunk and return only its summaries"""
+    policy, n, seed_seq, edges = task
+    draws = draw_uncertainty(n, seed_seq)
+    growth, inflation, unemployment = simulate_policy_outcomes(*policy, draws)
+
+    return {
+        'growth': summarize_draws(growth, edges['growth']),
+        'inflation': summarize_draws(inflation, edges['inflation']),
+        'unemployment': summarize_draws(unemployment, edges['unemployment'])
+    }
+
+
+def run_monte_carlo(G_opt, r_opt, C, I, G, NX, r, inflation, unemployment,
+                    n_sim, seed=42, n_workers=None):
+    """Chunked Monte Carlo that streams every chunk into summaries; raw draws are never kept.
+    
+    n_workers=1 reduces the chunks in-process; otherwise they run on a process pool and
+    workers ship back summaries only.
+    """
+    policy = (G_opt, r_opt, C, I, G, NX, r, inflation, unemployment)
+    pilot_seq, *chunk_seqs = np.random.SeedSequence(seed).spawn(1 + -(-n_sim // CHUNK_SIZE))
+
+    edges = _pilot_edges(*simulate_policy_outcomes(*policy, draw_uncertainty(PILOT_SIZE, pilot_seq)))
+
+    sizes = [CHUNK_SIZE] * (len(chunk_seqs) - 1) + [n_sim - CHUNK_SIZE * (len(chunk_seqs) - 1)]
+    tasks = [(policy, n, seq, edges) for n, seq in zip(sizes, chunk_seqs)]
+
+    merged = {name: empty_summary(edges[name]) for name in edges}
+    n_workers = min(n_workers or os.cpu_count() or 1, len(tasks))
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            for part in pool.map(_run_chunk, tasks):
+                merged = {name: merge_summaries(merged[name], part[name]) for name in merged}
+    else:
+        for task in tasks:
+            part = _run_chunk(task)
+            merged = {name: merge_summaries(merged[name], part[name]) for name in merged}
+
+    return merged, edges
+
+
+def summary_risk_metrics(merged, edges):
+    """Compact risk metrics (moments, quantiles, VaR/CVaR, plotting histogram) from merged summaries"""
+    metrics = {}
+    for name in ('growth', 'inflation', 'unemployment'):
+        summary = merged[name]
+        ci_lower, ci_upper = summary_quantile(summary, edges[name], [0.025, 0.975])
+        metrics[name] = {
+            'mean': summary['mean'],
+            'std': np.sqrt(summary['m2'] / summary['n']),
+            'ci_lower': ci_lower,
+            'ci_upper': ci_upper,
+            'hist': compact_histogram(summary, edges[name])
+        }
+
+    growth = merged['growth']
+    metrics['growth']['var_95'] = summary_quantile(growth, edges['growth'], 0.05)[0]
+    metrics['growth']['cvar_95'] = summary_cvar(growth, edges['growth'], 0.05)
+    metrics['prob_recession'] = growth['n_negative'] / growth['n'] * 100
+
+    return metrics
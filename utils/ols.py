@@ -0,0 +1,424 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Least-squares core for the Econometrics Lab. The design matrix is factorized once
+# (thin QR, X = QR); coefficients, every covariance estimator, leverages and auxiliary
+# regressions are then triangular solves and products with Q, with no refitting.
+
+COV_TYPES = ['nonrobust', 'HC0', 'HC1', 'HC2', 'HC3']
+RANK_TOL = 1e-10                 # |R_jj| below this (relative to the largest) means collinear columns
+
+
+def design_matrix(df, y_var, x_vars):
+    """(y, X with a leading constant, column names, row index), dropping rows with any missing value"""
+    data = df[[y_var] + list(x_vars)].apply(pd.to_numeric, errors='coerce').dropna()
+    X = np.column_stack([np.ones(len(data)), data[list(x_vars)].to_numpy(dtype=float)])
+    return data[y_var].to_numpy(dtype=float), X, ['const'] + list(x_vars), data.index
+
+
+def matrix_key(X):
+    """Content hash of a design matrix (or response vector), used to reuse its factorization"""
+    X = np.ascontiguousarray(X, dtype=float)
+    return f"{X.shape}:{hashlib.sha1(X.tobytes()).hexdigest()}"
+
+
+def factorize(X):
+    """Thin QR of X plus the quantities every later step reuses.
+
+    Raises ValueError if columns are perfectly collinear. Returns a dict with 'Q', 'R',
+    'R_inv', 'leverage' (diagonal of the hat matrix) and 'key' (see matrix_key).
+    """
+    Q, R = np.linalg.qr(X)
+    diag = np.abs(np.diag(R))
+    if diag.size and diag.min() <= RANK_TOL * diag.max():
+        raise ValueError("Regressors are perfectly collinear; drop a redundant variable")
+
+    R_inv = np.linalg.solve(R, np.eye(len(R)))
+    return {
+        'Q': Q,
+        'R': R,
+        'R_inv': R_inv,
+        'leverage': (Q ** 2).sum(axis=1),
+        'key': matrix_key(X)
+    }
+
+
+def coef_table(params, cov, df_resid):
+    """Standard errors, t-statistics and two-sided p-values for a coefficient covariance"""
+    bse = np.sqrt(np.diag(cov))
+    tvalues = params / bse
+    return bse, tvalues, 2 * stats.t.sf(np.abs(tvalues), df_resid)
+
+
+def robust_cov(fit, factor, cov_type='HC1'):
+    """Heteroskedasticity-consistent covariance (HC0-HC3) from the cached factorization.
+
+    With X = QR the sandwich (X'X)^-1 X' diag(w) X (X'X)^-1 is R^-1 (Q' diag(w) Q) R^-T,
+    and HC2/HC3 use the leverages already in the factorization.
+    """
+    if cov_type == 'nonrobust':
+        return fit['scale'] * factor['R_inv'] @ factor['R_inv'].T
+
+    u2 = fit['resid'] ** 2
+    if cov_type == 'HC2':
+        u2 = u2 / (1 - factor['leverage'])
+    elif cov_type == 'HC3':
+        u2 = u2 / (1 - factor['leverage']) ** 2
+
+    meat = factor['Q'].T @ (factor['Q'] * u2[:, None])
+    cov = factor['R_inv'] @ meat @ factor['R_inv'].T
+    if cov_type == 'HC1':
+        cov *= fit['nobs'] / fit['df_resid']
+    return cov
+
+
+def fit_statistics(ssr, centered_tss, nobs, k):
+    """Goodness-of-fit statistics shared by the in-memory and streaming estimators"""
+    df_model, df_resid = k - 1, nobs - k
+    fit = {
+        'scale': ssr / df_resid,
+        'ssr': ssr,
+        'rsquared': 1 - ssr / centered_tss,
+        'rsquared_adj': 1 - (ssr / df_resid) / (centered_tss / (nobs - 1)),
+        'nobs': nobs,
+        'df_model': df_model,
+        'df_resid': df_resid
+    }
+    fit['fvalue'] = ((centered_tss - ssr) / df_model) / fit['scale'] if df_model > 0 else np.nan
+    fit['f_pvalue'] = stats.f.sf(fit['fvalue'], df_model, df_resid) if df_model > 0 else np.nan
+
+    # Gaussian log-likelihood at the ML variance estimate
+    fit['llf'] = -nobs / 2 * (np.log(2 * np.pi) + np.log(ssr / nobs) + 1)
+    fit['aic'] = -2 * fit['llf'] + 2 * k
+    fit['bic'] = -2 * fit['llf'] + np.log(nobs) * k
+    return fit
+
+
+def fit_ols(y, X, factor=None, cov_type='nonrobust'):
+    """OLS through a (cached) QR factorization of X, whose first column must be the constant.
+
+    Returns a dict of arrays and statistics: params, bse, tvalues, pvalues (under cov_type),
+    cov, fitted, resid, scale, rsquared, rsquared_adj, fvalue, f_pvalue, llf, aic, bic,
+    nobs, df_model and df_resid.
+    """
+    factor = factor or factorize(X)
+    nobs, k = X.shape
+    qty = factor['Q'].T @ y
+    params = factor['R_inv'] @ qty
+    fitted = factor['Q'] @ qty
+    resid = y - fitted
+
+    fit = fit_statistics(resid @ resid, ((y - y.mean()) ** 2).sum(), nobs, k)
+    fit.update({'params': params, 'fitted': fitted, 'resid': resid, 'cov_type': cov_type})
+    fit['cov'] = robust_cov(fit, factor, cov_type)
+    fit['bse'], fit['tvalues'], fit['pvalues'] = coef_table(params, fit['cov'], fit['df_resid'])
+    return fit
+
+
+def breusch_pagan(resid, factor):
+    """Koenker's studentized Breusch-Pagan test on the regressors of the cached factorization.
+
+    The auxiliary regression of squared residuals on X is a projection with Q. Returns
+    (LM statistic, LM p-value, F statistic, F p-value) like statsmodels' het_breuschpagan.
+    """
+    u2 = resid ** 2
+    n, k = factor['Q'].shape
+    aux_resid = u2 - factor['Q'] @ (factor['Q'].T @ u2)
+    r2 = 1 - (aux_resid @ aux_resid) / ((u2 - u2.mean()) ** 2).sum()
+
+    lm = n * r2
+    f = (r2 / (k - 1)) / ((1 - r2) / (n - k))
+    return lm, stats.chi2.sf(lm, k - 1), f, stats.f.sf(f, k - 1, n - k)
+
+
+def residual_diagnostics(resid, factor):
+    """Normality, autocorrelation and conditioning diagnostics of statsmodels' OLS summary.
+
+    Returns a dict with omnibus / omnibus_pvalue (D'Agostino-Pearson, NaN below 8
+    observations), skew, kurtosis, jarque_bera / jb_pvalue, durbin_watson and
+    condition_number (of X, read off R since X = QR shares its singular values).
+    """
+    omnibus, omnibus_pvalue = stats.normaltest(resid) if len(resid) >= 8 else (np.nan, np.nan)
+    jarque_bera, jb_pvalue = stats.jarque_bera(resid)
+    return {
+        'omnibus': omnibus,
+        'omnibus_pvalue': omnibus_pvalue,
+        'skew': stats.skew(resid),
+        'kurtosis': stats.kurtosis(resid, fisher=False),
+        'jarque_bera': jarque_bera,
+        'jb_pvalue': jb_pvalue,
+        'durbin_watson': (np.diff(resid) ** 2).sum() / (resid @ resid),
+        'condition_number': np.linalg.cond(factor['R'])
+    }
+
+
+def vif(X):
+    """Variance inflation factors of every non-constant column in one pass.
+
+    VIF_j = 1 / (1 - R_j^2) from the regression of x_j on the other regressors and a
+    constant, which is the j-th diagonal element of the inverse correlation matrix.
+    """
+    corr = np.corrcoef(X, rowvar=False)
+    return np.diag(np.linalg.pinv(np.atleast_2d(corr)))
+
+
+
+# ==================== STREAMING OLS ====================
+
+CHUNK_ROWS = 250_000             # Rows parsed per chunk in streaming mode
+STREAM_COV_TYPES = ['nonrobust', 'HC0', 'HC1']
+DATA_DIR = os.environ.get('ECONOMETRICS_DATA_DIR')   # Server directory streamed files may come from (unset: uploads only)
+
+
+def data_file(path, data_dir=None):
+    """Resolve a CSV or Parquet file inside the data directory; None for anything else.
+
+    Paths are taken relative to the directory and resolved (symlinks, '..') before the
+    check, so files outside it can never be opened.
+    """
+    data_dir = data_dir or DATA_DIR
+    if not data_dir:
+        return None
+    root = os.path.realpath(data_dir)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        return None
+    if not (os.path.isfile(full) and full.lower().endswith(('.csv', '.parquet'))):
+        return None
+    return full
+
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def _is_parquet(source):
+    return str(getattr(source, 'name', source)).lower().endswith('.parquet')
+
+
+def preview_file(source, nrows=1000):
+    """First rows of a CSV or Parquet file (path or uploaded file), without reading the rest"""
+    _rewind(source)
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        batch = next(pq.ParquetFile(source).iter_batches(batch_size=nrows), None)
+        frame = batch.to_pandas() if batch is not None else pd.DataFrame()
+    else:
+        frame = pd.read_csv(source, nrows=nrows)
+    _rewind(source)
+    return frame
+
+
+def iter_chunks(source, columns, chunksize=CHUNK_ROWS):
+    """Yield DataFrames of the requested columns, chunksize rows at a time"""
+    _rewind(source)
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=list(columns)):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, usecols=list(columns), chunksize=chunksize)
+
+
+def _row_kron(X):
+    """Row-wise Kronecker products x_i (x) x_i as an (n, k*k) matrix"""
+    return (X[:, :, None] * X[:, None, :]).reshape(len(X), -1)
+
+
+def streaming_ols(chunks, y_var, x_vars, cov_type='HC1'):
+    """OLS with classical and HC0/HC1 standard errors in a single pass over data chunks.
+
+    Only k x k cross products and the (k^2 x k^2) moments the HC0 sandwich needs are held,
+    so memory does not grow with the number of rows. Residuals are taken around a pilot
+    estimate from the first chunk, r = y - X b0; with d = b - b0 the final residuals are
+    r - X d, so SSR and the sandwich meat sum(x x' (r - x'd)^2) follow from the
+    accumulated sums of r^2 x x', r x x' x and (x x')(x x')' without a second pass.
+    Returns a dict like fit_ols without residuals, plus 'covs' (every STREAM_COV_TYPES
+    covariance), 'n_chunks' and 'n_dropped' (rows with missing or non-numeric values).
+    """
+    x_vars = list(x_vars)
+    k = len(x_vars) + 1
+    beta0 = y0 = None
+    nobs = n_dropped = n_chunks = 0
+    XtX, Xtr, rtr = np.zeros((k, k)), np.zeros(k), 0.0
+    y_sum = y_sq = 0.0
+    A, B, C = np.zeros(k * k), np.zeros((k * k, k)), np.zeros((k * k, k * k))
+
+    for chunk in chunks:
+        n_chunks += 1
+        data = chunk[[y_var] + x_vars].apply(pd.to_numeric, errors='coerce').dropna()
+        n_dropped += len(chunk) - len(data)
+        if data.empty:
+            continue
+        y = data[y_var].to_numpy(dtype=float)
+        X = np.column_stack([np.ones(len(data)), data[x_vars].to_numpy(dtype=float)])
+
+        if beta0 is None:
+            beta0 = np.linalg.lstsq(X, y, rcond=None)[0]
+            y0 = y.mean()
+        r = y - X @ beta0
+        Z = _row_kron(X)
+
+        nobs += len(y)
+        XtX += X.T @ X
+        Xtr += X.T @ r
+        rtr += r @ r
+        y_sum += (y - y0).sum()
+        y_sq += (y - y0) @ (y - y0)
+        A += Z.T @ (r * r)
+        B += Z.T @ (X * r[:, None])
+        C += Z.T @ Z
+
+    if nobs <= k:
+        raise ValueError("Not enough complete rows for the selected variables")
+    try:
+        np.linalg.cholesky(XtX)
+    except np.linalg.LinAlgError:
+        raise ValueError("Regressors are perfectly collinear; drop a redundant variable")
+
+    XtX_inv = np.linalg.inv(XtX)
+    delta = XtX_inv @ Xtr
+    fit = fit_statistics(rtr - delta @ Xtr, y_sq - y_sum ** 2 / nobs, nobs, k)
+
+    meat = (A - 2 * B @ delta + C @ np.kron(delta, delta)).reshape(k, k)
+    hc0 = XtX_inv @ meat @ XtX_inv
+    fit.update({
+        'params': beta0 + delta,
+        'covs': {'nonrobust': fit['scale'] * XtX_inv, 'HC0': hc0, 'HC1': hc0 * nobs / fit['df_resid']},
+        'cov_type': cov_type,
+        'n_chunks': n_chunks,
+        'n_dropped': n_dropped
+    })
+    fit['cov'] = fit['covs'][cov_type]
+    fit['bse'], fit['tvalues'], fit['pvalues'] = coef_table(fit['params'], fit['cov'], fit['df_resid'])
+    return fit
+
+
+# ==================== RESAMPLING INFERENCE ====================
+
+BOOT_METHODS = ['pairs', 'residual', 'wild']
+BOOT_ELEMENTS = 4_000_000        # Resampled values held per batch (rows x replications)
+POOL_MIN_ELEMENTS = 50_000_000   # Below this many rows x replications, workers cost more than they save
+
+
+def _bootstrap_batch(method, y, X, factor, fit, b, rng):
+    """(b, k) coefficient draws for one batch of replications"""
+    n = len(y)
+    if method == 'pairs':
+        # Resampling rows with replacement is weighting them by their counts:
+        # X*'X* = X' diag(c) X, which for every replication at once is counts @ (x (x) x)
+        idx = rng.integers(0, n, (b, n)) + np.arange(b)[:, None] * n
+        counts = np.bincount(idx.ravel(), minlength=b * n).reshape(b, n).astype(float)
+        k = X.shape[1]
+        xtx = (counts @ _row_kron(X)).reshape(b, k, k)
+        xty = counts @ (X * y[:, None])
+        # pinv keeps degenerate resamples (e.g. a dummy that is never drawn) finite
+        return (np.linalg.pinv(xtx) @ xty[:, :, None])[:, :, 0]
+
+    if method == 'residual':
+        # Centered residuals rescaled by sqrt(n / df_resid), drawn with replacement
+        pool = (fit['resid'] - fit['resid'].mean()) * np.sqrt(n / fit['df_resid'])
+        errors = pool[rng.integers(0, n, (n, b), dtype=np.int32)]
+    else:
+        # Wild bootstrap: Rademacher signs on leverage-adjusted (HC2) residuals
+        pool = fit['resid'] / np.sqrt(1 - factor['leverage'])
+        errors = pool[:, None] * rng.choice([-1.0, 1.0], (n, b))
+
+    # y* = fitted + e*, so b* = b + R^-1 Q' e* through the cached factorization
+    return fit['params'] + (factor['R_inv'] @ (factor['Q'].T @ errors)).T
+
+
+def _permutation_batch(y, X, factor, t_obs, reduced, b, rng):
+    """Per coefficient, how many of b Freedman-Lane permutations give |t*| >= |t|"""
+    n, k = X.shape
+    perms = rng.permuted(np.tile(np.arange(n, dtype=np.int32), (b, 1)), axis=1).T
+    se_scale = np.sqrt(np.einsum('ij,ij->i', factor['R_inv'], factor['R_inv']))
+    exceed = np.zeros(k, dtype=np.int64)
+
+    for j, (fitted_r, resid_r) in reduced.items():
+        # Permute the residuals of the model without x_j and refit the full model. With
+        # Y = fitted + E, Q'Y and ||Y||^2 only need Q'E and fitted'E, and SSR = ||Y||^2 - ||Q'Y||^2
+        # (the constant in X makes centering the fitted values harmless and avoids cancellation)
+        fitted_c = fitted_r - fitted_r.mean()
+        E = resid_r[perms]
+        qty = (factor['Q'].T @ fitted_c)[:, None] + factor['Q'].T @ E
+        yty = fitted_c @ fitted_c + 2 * (fitted_c @ E) + resid_r @ resid_r
+        s = np.sqrt(np.maximum(yty - (qty ** 2).sum(axis=0), 0) / (n - k))
+        t = (factor['R_inv'][j] @ qty) / (s * se_scale[j])
+        exceed[j] = (np.abs(t) >= np.abs(t_obs[j])).sum()
+    return exceed
+
+
+def _resample_block(task):
+    """Worker: one block of bootstrap replications or permutations"""
+    kind, y, X, factor, fit, extra, n_reps, seed = task
+    rng = np.random.default_rng(seed)
+    batch = max(1, BOOT_ELEMENTS // len(y))
+    results = []
+    for start in range(0, n_reps, batch):
+        b = min(batch, n_reps - start)
+        if kind == 'permutation':
+            results.append(_permutation_batch(y, X, factor, fit['tvalues'], extra, b, rng))
+        else:
+            results.append(_bootstrap_batch(kind, y, X, factor, fit, b, rng))
+    return sum(results) if kind == 'permutation' else np.concatenate(results)
+
+
+def _run_blocks(kind, y, X, factor, fit, extra, n_reps, seed, n_workers):
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_reps, len(y) * n_reps // POOL_MIN_ELEMENTS))
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    tasks = [(kind, y, X, factor, fit, extra, len(block), block_seed)
+             for block, block_seed in zip(np.array_split(np.arange(n_reps), n_workers), seeds)]
+    if n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            return list(pool.map(_resample_block, tasks)), n_workers
+    return [_resample_block(task) for task in tasks], n_workers
+
+
+def bootstrap(y, X, factor=None, method='pairs', n_reps=2000, alpha=0.05, seed=0, n_workers=None):
+    """Pairs, residual or wild bootstrap of OLS coefficients, batched and spread over processes.
+
+    Each batch draws its whole resample index (or sign) matrix at once and solves every
+    replication together: residual and wild draws through the cached QR, pairs draws as
+    count-weighted normal equations. Returns a dict with 'draws' (n_reps x k), 'se',
+    percentile 'ci_low'/'ci_high' at level 1 - alpha, and 'n_workers'.
+    """
+    factor = factor or factorize(X)
+    fit = fit_ols(y, X, factor)
+    blocks, n_workers = _run_blocks(method, y, X, factor, fit, None, n_reps, seed, n_workers)
+    draws = np.concatenate(blocks)
+    return {
+        'draws': draws,
+        'se': draws.std(axis=0, ddof=1),
+        'ci_low': np.quantile(draws, alpha / 2, axis=0),
+        'ci_high': np.quantile(draws, 1 - alpha / 2, axis=0),
+        'n_workers': n_workers
+    }
+
+
+def permutation_test(y, X, factor=None, n_perm=2000, seed=0, n_workers=None):
+    """Freedman-Lane permutation p-values for every slope (NaN for the constant).
+
+    For each regressor the model without it is fitted once; its residuals are permuted,
+    added back to its fitted values and the full model is refitted through the cached QR,
+    comparing the studentized coefficient with the observed t-statistic.
+    Returns a dict with 'pvalues' and 'n_workers'.
+    """
+    factor = factor or factorize(X)
+    fit = fit_ols(y, X, factor)
+    reduced = {}
+    for j in range(1, X.shape[1]):
+        reduced_fit = fit_ols(y, np.delete(X, j, axis=1))
+        reduced[j] = (reduced_fit['fitted'], reduced_fit['resid'])
+
+    blocks, n_workers = _run_blocks('permutation', y, X, factor, fit, reduced, n_perm, seed, n_workers)
+    pvalues = (1 + sum(blocks)) / (n_perm + 1)
+    pvalues = pvalues.astype(float)
+    pvalues[0] = np.nan
+    return {'pvalues': pvalues, 'n_workers': n_workers}
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are serialized within the process only
+    fcntl = None
+
+# Country x year x indicator panel persisted as Parquet (override with WORLD_BANK_PANEL)
+PANEL_PATH = os.environ.get(
+    'WORLD_BANK_PANEL',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'world_bank_panel.parquet')
+)
+INDEX = ['Code', 'Year']
+
+_write_lock = threading.Lock()
+
+
+def empty_panel():
+    """Wide panel: (Code, Year) index, a categorical Country name column and one float32 column per indicator"""
+    index = pd.MultiIndex.from_arrays([pd.Index([], dtype=object), pd.Index([], dtype=np.int16)], names=INDEX)
+    return pd.DataFrame({'Country': pd.Categorical([])}, index=index)
+
+
+def _normalize(panel):
+    """Compact dtypes and sort the index so slices are indexed lookups"""
+    panel = panel.sort_index()
+    panel.index = panel.index.set_levels(panel.index.levels[1].astype(np.int16), level='Year')
+    panel['Country'] = panel['Country'].astype('category')
+    indicators = [col for col in panel.columns if col != 'Country']
+    panel[indicators] = panel[indicators].astype(np.float32)
+    return panel[['Country'] + indicators]
+
+
+def upsert_indicator(panel, indicator_code, df, country_codes=None):
+    """Insert or overwrite one indicator from a long (Code, Country, Year, Value) frame.
+
+    country_codes are the countries the frame was fetched for; they are recorded in
+    panel.attrs['fetched'] (kept in the Parquet file), so countries the source has no
+    values for still count as covered.
+    """
+    if df is None:
+        return panel
+
+    fetched = {code: list(countries) for code, countries in panel.attrs.get('fetched', {}).items()}
+    if country_codes is not None:
+        fetched[indicator_code] = sorted(set(fetched.get(indicator_code, [])) | set(country_codes))
+
+    if df.empty:
+        panel = panel.copy()
+    else:
+        index = pd.MultiIndex.from_arrays([df['Code'].astype(str).values, df['Year'].astype(np.int16).values],
+                                          names=INDEX)
+        new = pd.DataFrame({'Country': df['Country'].astype(str).values,
+                            indicator_code: df['Value'].astype(np.float32).values}, index=index)
+
+        # New non-missing cells win; every other cell of the panel is kept as is
+        current = panel.astype({'Country': object})
+        panel = _normalize(new.combine_first(current))
+    panel.attrs['fetched'] = fetched
+    return panel
+
+
+def covers(panel, indicator_code, country_codes):
+    """True if every requested country has a value of the indicator or was included in a fetch of it"""
+    present = set(panel.attrs.get('fetched', {}).get(indicator_code, []))
+    if indicator_code in panel:
+        present |= set(panel[indicator_code].dropna().index.get_level_values('Code'))
+    return set(country_codes) <= present
+
+
+def indicator_frame(panel, indicator_code, country_codes):
+    """Year x country-name matrix of one indicator for charts"""
+    if indicator_code not in panel:
+        return pd.DataFrame()
+    rows = panel.loc[panel.index.get_level_values('Code').isin(country_codes), ['Country', indicator_code]]
+    rows = rows.dropna(subset=[indicator_code])
+    frame = rows.reset_index().pivot(index='Year', columns='Country', values=indicator_code)
+    frame.columns = frame.columns.astype(str)
+    return frame
+
+
+def latest_values(panel, indicator_codes, country_codes):
+    """Latest-year value per country for each indicator (each indicator uses its own latest year).
+
+    Returns (DataFrame indexed by country name with one column per indicator, {indicator: year}).
+    """
+    selected = panel.loc[panel.index.get_level_values('Code').isin(country_codes)]
+    names = selected['Country'].astype(str).groupby(level='Code').first()
+
+    columns, years = {}, {}
+    for code in indicator_codes:
+        if code not in selected:
+            continue
+        values = selected[code].dropna()
+        if values.empty:
+            continue
+        years[code] = int(values.index.get_level_values('Year').max())
+        latest = values.xs(years[code], level='Year')
+        columns[code] = latest.rename(index=names)
+
+    latest = pd.DataFrame(columns)
+    latest.index.name = 'Country'
+    return latest, years
+
+
+def save_panel(panel, path=None):
+    """Write the panel to Parquet atomically (temp file + rename), so readers never see a partial file"""
+    path = path or PANEL_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.parquet.tmp')
+    os.close(fd)
+    try:
+        panel.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_panel(path=None):
+    """Read the persisted panel, or an empty one if none has been saved yet"""
+    path = path or PANEL_PATH
+    if not os.path.exists(path):
+        return empty_panel()
+    return _normalize(pd.read_parquet(path))
+
+
+@contextmanager
+def panel_lock(path=None):
+    """Exclusive writer lock on the panel: an flock on a sidecar .lock file, shared by every process"""
+    path = path or PANEL_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _write_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + '.lock', 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def update_panel(frames, country_codes=None, path=None):
+    """Upsert {indicator_code: long frame} fetched for country_codes into the persisted panel.
+
+    The panel is re-read under the writer lock, so indicators saved concurrently by the
+    background refresher or another session are merged rather than overwritten. Returns
+    the saved panel.
+    """
+    with panel_lock(path):
+        panel = load_panel(path)
+        for indicator_code, df in frames.items():
+            panel = upsert_indicator(panel, indicator_code, df, country_codes)
+        save_panel(panel, path)
+    return panel
@@ -0,0 +1,279 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.panel_store import PANEL_PATH, update_panel
+
+API_URL = "https://api.worldbank.org/v2/country/{countries}/indicator/{indicator}"
+
+# On-disk response cache (override the location with the WORLD_BANK_CACHE environment variable)
+CACHE_PATH = os.environ.get(
+    'WORLD_BANK_CACHE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'world_bank.sqlite')
+)
+DEFAULT_TTL = 24 * 3600          # Annual indicators: refresh at most daily
+MAX_STALE = 30 * 24 * 3600       # Serve stale data while revalidating for up to 30 days
+MAX_CONCURRENCY = 8              # Simultaneous API requests (and pooled connections)
+PER_PAGE = 1000
+CACHE_VERSION = 'v2'             # Bump when the cached frame layout changes
+RETRY_INTERVAL = 15 * 60         # Background retry delay after a refresh that fetched nothing
+REFRESH_MARKER = PANEL_PATH + '.refreshed'   # Touched after each full refresh (on-demand saves don't)
+
+# Indicators and countries of the Real World Data page, keyed by the page's translation
+# keys; the background refresher keeps exactly this indicator x country matrix warm
+INDICATOR_CODES = {
+    # Economic
+    'gdp_growth': 'NY.GDP.MKTP.KD.ZG',
+    'inflation': 'FP.CPI.TOTL.ZG',
+    'gdp_per_capita': 'NY.GDP.PCAP.CD',
+    'unemployment': 'SL.UEM.TOTL.ZS',
+    'trade_balance': 'NE.TRD.GNFS.ZS',
+    'fdi': 'BX.KLT.DINV.WD.GD.ZS',
+    # Human Development
+    'life_expectancy': 'SP.DYN.LE00.IN',
+    'literacy_rate': 'SE.ADT.LITR.ZS',
+    'school_enrollment': 'SE.PRM.NENR',
+    'infant_mortality': 'SP.DYN.IMRT.IN',
+    'access_electricity': 'EG.ELC.ACCS.ZS',
+    'internet_users': 'IT.NET.USER.ZS'
+}
+COUNTRY_CODES = {
+    'idn': 'IDN', 'mys': 'MYS', 'sgp': 'SGP', 'tha': 'THA', 'vnm': 'VNM', 'phl': 'PHL',
+    'chn': 'CHN', 'usa': 'USA', 'jpn': 'JPN', 'kor': 'KOR', 'aus': 'AUS', 'ind': 'IND',
+    'gbr': 'GBR', 'deu': 'DEU', 'bra': 'BRA', 'mex': 'MEX', 'tur': 'TUR', 'sau': 'SAU'
+}
+WATCHLIST_INDICATORS = list(INDICATOR_CODES.values())
+WATCHLIST_COUNTRIES = list(COUNTRY_CODES.values())
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+_scheduler = None
+_scheduler_lock = threading.Lock()
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared HTTP session, so every request reuses pooled keep-alive connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENCY)
+            _session.mount('https://', adapter)
+    return _session
+
+
+def _get_page(url, params, page, timeout):
+    response = get_session().get(url, params={**params, 'page': page}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_indicator(indicator_code, country_codes, start_year=2010, end_year=2024, timeout=10):
+    """Fetch one indicator from the World Bank API, following pagination (raises on network or HTTP errors)"""
+    url = API_URL.format(countries=';'.join(country_codes), indicator=indicator_code)
+    params = {
+        'date': f'{start_year}:{end_year}',
+        'format': 'json',
+        'per_page': PER_PAGE
+    }
+
+    data = _get_page(url, params, 1, timeout)
+    records = list(data[1] or []) if len(data) > 1 else []
+
+    # Remaining pages, if the first page reports more than one
+    n_pages = int(data[0].get('pages', 1)) if isinstance(data[0], dict) else 1
+    for page in range(2, n_pages + 1):
+        more = _get_page(url, params, page, timeout)
+        records.extend((more[1] or []) if len(more) > 1 else [])
+
+    if records:
+        df = pd.DataFrame(records)
+        df = df[['country', 'countryiso3code', 'date', 'value']].copy()
+        df.columns = ['Country', 'Code', 'Year', 'Value']
+        df['Country'] = df['Country'].apply(lambda x: x['value'])
+        df['Year'] = pd.to_numeric(df['Year'])
+        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+        return df.dropna().reset_index(drop=True)
+    return pd.DataFrame(columns=['Country', 'Code', 'Year', 'Value'])
+
+
+# ==================== PERSISTENT CACHE ====================
+
+def cache_key(indicator_code, country_codes, start_year, end_year):
+    """Cache key: payload version, indicator, sorted country set and year range"""
+    return f"{CACHE_VERSION}|{indicator_code}|{';'.join(sorted(country_codes))}|{start_year}:{end_year}"
+
+
+def _connect(path=None):
+    path = path or CACHE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS responses "
+                 "(key TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload TEXT NOT NULL)")
+    return conn
+
+
+def read_cache(key, path=None):
+    """Return (DataFrame, fetched_at) for a cached response, or (None, None)"""
+    with _connect(path) as conn:
+        row = conn.execute("SELECT payload, fetched_at FROM responses WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None, None
+    return pd.DataFrame(json.loads(row[0])), row[1]
+
+
+def write_cache(key, df, path=None):
+    """Store a response, replacing any previous entry for the key"""
+    payload = json.dumps(df.to_dict(orient='list'))
+    with _connect(path) as conn:
+        conn.execute("INSERT OR REPLACE INTO responses (key, fetched_at, payload) VALUES (?, ?, ?)",
+                     (key, time.time(), payload))
+
+
+def _refresh(key, indicator_code, country_codes, start_year, end_year, path):
+    """Background revalidation; failures keep the stale entry in place"""
+    try:
+        write_cache(key, fetch_indicator(indicator_code, country_codes, start_year, end_year), path)
+    except (requests.RequestException, ValueError):
+        pass
+    finally:
+        with _refresh_lock:
+            _refreshing.discard(key)
+
+
+def cached_fetch(indicator_code, country_codes, start_year=2010, end_year=2024,
+                 ttl=DEFAULT_TTL, stale_while_revalidate=True, path=None):
+    """Fetch an indicator through the on-disk cache.
+
+    Fresh entries (younger than ttl) are served from disk. Stale entries younger than
+    MAX_STALE are served immediately while a background thread revalidates them. Missing
+    or expired entries are fetched from the API, and if the API is down any cached copy is
+    served instead. Returns (DataFrame or None, source, age in seconds or None) where
+    source is 'cache', 'stale', 'api' or 'offline'.
+    """
+    key = cache_key(indicator_code, country_codes, start_year, end_year)
+    cached, fetched_at = read_cache(key, path)
+    age = time.time() - fetched_at if fetched_at is not None else None
+
+    if cached is not None and age < ttl:
+        return cached, 'cache', age
+
+    if cached is not None and stale_while_revalidate and age < MAX_STALE:
+        with _refresh_lock:
+            start = key not in _refreshing
+            _refreshing.add(key)
+        if start:
+            threading.Thread(target=_refresh, daemon=True,
+                             args=(key, indicator_code, country_codes, start_year, end_year, path)).start()
+        return cached, 'stale', age
+
+    try:
+        df = fetch_indicator(indicator_code, country_codes, start_year, end_year)
+    except (requests.RequestException, ValueError):
+        # API outage: fall back to whatever copy we have, however old
+        return cached, 'offline', age
+
+    write_cache(key, df, path)
+    return df, 'api', 0.0
+
+
+def fetch_indicators(indicator_codes, country_codes, start_year=2010, end_year=2024,
+                     ttl=DEFAULT_TTL, max_workers=MAX_CONCURRENCY):
+    """Fetch several indicators at once through the cache, with bounded concurrency.
+
+    Returns {indicator_code: (DataFrame or None, source, age)} as for cached_fetch; the
+    requests share one pooled session, so a panel loads in about one round trip.
+    """
+    indicator_codes = list(dict.fromkeys(indicator_codes))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(indicator_codes)))) as pool:
+        results = pool.map(lambda code: cached_fetch(code, country_codes, start_year, end_year, ttl),
+                           indicator_codes)
+        return dict(zip(indicator_codes, results))
+
+
+# ==================== BACKGROUND REFRESH ====================
+
+def _revalidate(indicator_code, country_codes, start_year, end_year):
+    """Fetch and cache one indicator, falling back to the cached copy if the API fails"""
+    key = cache_key(indicator_code, country_codes, start_year, end_year)
+    try:
+        df = fetch_indicator(indicator_code, country_codes, start_year, end_year)
+        write_cache(key, df)
+        return df
+    except (requests.RequestException, ValueError):
+        return read_cache(key)[0]
+
+
+def refresh_snapshot(indicator_codes=WATCHLIST_INDICATORS, country_codes=WATCHLIST_COUNTRIES,
+                     start_year=2010, end_year=2024, max_workers=MAX_CONCURRENCY):
+    """Revalidate every indicator for the full country set and publish one panel snapshot.
+
+    The snapshot is merged into the latest panel under the writer lock and written
+    atomically, so readers see either the previous panel or the new one. Returns the published panel, or None if nothing could be fetched or read.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = list(pool.map(lambda code: _revalidate(code, country_codes, start_year, end_year),
+                               indicator_codes))
+    if all(df is None or df.empty for df in frames):
+        return None
+
+    panel = update_panel(dict(zip(indicator_codes, frames)), country_codes)
+    with open(REFRESH_MARKER, 'w') as marker:
+        marker.write(f"{time.time()}\n")
+    return panel
+
+
+def snapshot_age(path=None):
+    """Seconds since the last full refresh published a snapshot (None if there has been none).
+
+    Read from the refresh marker rather than the panel itself, whose mtime also moves when
+    the page saves an indicator fetched on demand.
+    """
+    path = path or REFRESH_MARKER
+    return time.time() - os.path.getmtime(path) if os.path.exists(path) else None
+
+
+def _refresh_loop(interval):
+    while True:
+        age = snapshot_age()
+        if age is not None and age < interval:
+            # A recent snapshot exists (e.g. from another process or before a restart)
+            time.sleep(interval - age)
+            continue
+        try:
+            published = refresh_snapshot()
+        except Exception:
+            # Keep the scheduler alive; the previous snapshot stays published
+            published = None
+        time.sleep(interval if published is not None else RETRY_INTERVAL)
+
+
+def start_background_refresh(interval=DEFAULT_TTL):
+    """Start the per-process refresher thread once; later calls are no-ops"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = threading.Thread(target=_refresh_loop, args=(interval,), daemon=True,
+                                          name='world-bank-refresh')
+            _scheduler.start()
+    return _scheduler
+
+
+if __name__ == '__main__':
+    # One-shot refresh for cron or a separate scheduler process: python -m utils.world_bank
+    published = refresh_snapshot()
+    if published is None:
+        print("World Bank API unavailable; snapshot not updated")
+    else:
+        print(f"Published {published.shape[1] - 1} indicators x "
+              f"{published.index.get_level_values('Code').nunique()} countries")